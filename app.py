@@ -1,436 +1,362 @@
+import asyncio
+import threading
+from functools import partial
 import gradio as gr
-from backend import summarize_text, extend_summary, extend_summary_custom, translate_text, get_text_from_url, clear_cache, get_cache_stats, summarize_file, languages_list
-from backend.validation import validate_text_input, validate_file_input, validate_url, validate_language, validate_custom_prompt, estimate_processing_time
-with gr.Blocks(theme=gr.themes.Soft()) as demo:
-    gr.HTML("""
-    <style>
-        .title-text {
-            font-size: 36px;
-            font-weight: bold;
-            color: #2c3e50;
-            text-align: center;
-        }
-    </style>
-    """)
+# Heavy backend functions are looked up on the package at call time, so the
+# Gemini/Whisper/yt-dlp imports only happen on first use
+import backend
+from backend import clear_cache, get_cache_stats, languages_list
+from backend.validation import validate_text_input, validate_file_input, validate_media_file, validate_url, validate_language, validate_custom_prompt, estimate_processing_time, probe_file
+
+# Queue settings: LLM calls are I/O-bound, so several can run side by side
+QUEUE_CONCURRENCY = 4
+QUEUE_MAX_SIZE = 64
+# Whisper transcription is CPU/GPU-bound, keep it to one job at a time; the limit is per
+# event, so all media events share one concurrency group
+MEDIA_CONCURRENCY = 1
+MEDIA_CONCURRENCY_ID = "media"
+# Clicks that arrive together are grouped into one batched call
+MAX_BATCH_SIZE = 8
+# Translation targets, built once and shared by every tab's dropdown
+LANGUAGE_CHOICES = languages_list
+# Fixed progress messages (steps with a time estimate format their own)
+PROG_FETCHING = "Fetching webpage content..."
+PROG_SUMMARIZING = "Summarizing content..."
+PROG_COMBINING = "Combining summaries..."
+# Gradio finds the progress parameter by its gr.Progress default and injects a
+# per-call tracker, so one shared instance serves as the marker for every handler
+TRACK_PROGRESS = gr.Progress()
+
+# --- Batched handlers: each input arrives as a list, one entry per queued click ---
+# A raised error would fail every click in the batch, so these report
+# problems per row in the output box instead of as a toast
+async def _run_batch(errors, batch_fn, *columns):
+    """Run batch_fn on the rows that passed validation and merge results back in order"""
+    valid_rows = [row for row, error in zip(zip(*columns), errors) if error is None]
+    results = iter(await asyncio.to_thread(batch_fn, *zip(*valid_rows)) if valid_rows else [])
+    return [[error or next(results) for error in errors]]
+
+async def extend_batch(summaries):
+    errors = [None if summary.strip() else "⚠️ Please provide a summary to extend." for summary in summaries]
+    return await _run_batch(errors, backend.extend_summaries, summaries)
+
+def _format_translations(translations):
+    """Render {language: translation} for the Translation box"""
+    if len(translations) == 1:
+        return next(iter(translations.values()))
+    return "\n\n".join(f"### {language}\n{text}" for language, text in translations.items())
+
+def _translate_and_format(summaries, language_lists):
+    return [_format_translations(t) for t in backend.translate_texts_multi(summaries, language_lists)]
+
+async def validate_and_translate_batch(summaries, language_lists):
+    errors = []
+    for summary, languages in zip(summaries, language_lists):
+        if not summary.strip():
+            errors.append("⚠️ Please provide a summary to translate.")
+            continue
+        if not languages:
+            errors.append("⚠️ Please select at least one language.")
+            continue
+        error_msg = None
+        for language in languages:
+            is_valid, message = validate_language(language)
+            if not is_valid:
+                error_msg = message
+                break
+        errors.append(error_msg)
+    # One request per summary covers all of its selected languages
+    language_lists = [tuple(languages or ()) for languages in language_lists]
+    return await _run_batch(errors, _translate_and_format, summaries, language_lists)
+
+# --- Error reporting: failures are shown as a toast instead of output text ---
+def _ui_error(message):
+    """Build a Gradio error toast from a "⚠️ ..." message"""
+    return gr.Error(message.removeprefix("⚠️").strip())
+
+def _raise_on_error(result):
+    """Raise a backend "⚠️ ..." result as an error toast, otherwise return it"""
+    if result.startswith("⚠️"):
+        raise _ui_error(result)
+    return result
+
+# --- Tab-specific summarize handlers ---
+async def validate_and_summarize_text(text):
+    # Validate text input first
+    is_valid, error_msg = validate_text_input(text)
+    if not is_valid:
+        raise _ui_error(error_msg)
+
+    # Stream the summary into the output box as it is generated
+    async for partial_summary in backend.summarize_text_stream(text):
+        yield _raise_on_error(partial_summary)
+
+async def summarize_text_file(file, progress=TRACK_PROGRESS):
+    if file is None:
+        raise _ui_error("⚠️ No file uploaded.")
+
+    # Validate file first
+    file_meta = probe_file(file.name)
+    is_valid, error_msg, ext = validate_file_input(file_meta)
+    if not is_valid:
+        raise _ui_error(error_msg)
+
+    # One progress update per phase; the result arriving clears the indicator
+    time_estimate = estimate_processing_time(file_meta)
+    progress(0.1, desc=f"Summarizing file... (Estimated: {time_estimate})")
+    try:
+        result = await asyncio.to_thread(backend.summarize_file, file.name)
+    except Exception as e:
+        raise _ui_error(f"⚠️ Error processing file: {e}")
+    return _raise_on_error(result)
+
+async def summarize_url(url, progress=TRACK_PROGRESS):
+    # Validate URL first
+    is_valid, error_msg = validate_url(url)
+    if not is_valid:
+        raise _ui_error(error_msg)
+
+    progress(0.2, desc=PROG_FETCHING)
+    # Make sure the async Gemini client used for streaming is ready while the page downloads
+    # (no-op once warmed up)
+    text, _ = await asyncio.gather(
+        asyncio.to_thread(backend.get_text_from_url, url, "Webpage"),
+        backend.warm_up_model_async()
+    )
+    text = _raise_on_error(text)
+
+    progress(0.6, desc=PROG_SUMMARIZING)
+    async for partial_summary in backend.summarize_text_stream(text):
+        yield _raise_on_error(partial_summary)
+
+async def summarize_media_url(url):
+    if not url:
+        raise _ui_error("⚠️ Please enter a media URL.")
+    text = _raise_on_error(await asyncio.to_thread(backend.get_text_from_url, url, "Media"))
+    async for partial_summary in backend.summarize_text_stream(text):
+        yield _raise_on_error(partial_summary)
+
+async def _summarize_transcript_windows(file_path):
+    """Summarize each transcript window while Whisper works on the next one"""
+    loop = asyncio.get_running_loop()
+    windows = asyncio.Queue()
+    stop = threading.Event()
+
+    def transcribe():
+        # Runs in a worker thread and hands windows to the event loop as they finish
+        try:
+            for window in backend.speech_to_text_windows(file_path, stop):
+                loop.call_soon_threadsafe(windows.put_nowait, window)
+        except backend.SumeError as e:
+            loop.call_soon_threadsafe(windows.put_nowait, e.message)
+        except Exception as e:
+            loop.call_soon_threadsafe(windows.put_nowait, f"⚠️ Error processing media: {e}")
+        finally:
+            loop.call_soon_threadsafe(windows.put_nowait, None)
+
+    def summarize(window):
+        # Windows still waiting for a worker thread are skipped once the handler has given up
+        return "" if stop.is_set() else backend.summarize_text(window)
+
+    transcription = asyncio.ensure_future(asyncio.to_thread(transcribe))
+    summaries = []
+    try:
+        while (window := await windows.get()) is not None:
+            _raise_on_error(window)
+            summaries.append(asyncio.ensure_future(asyncio.to_thread(summarize, window)))
+        await transcription
+        return [_raise_on_error(summary) for summary in await asyncio.gather(*summaries)]
+    finally:
+        # On an error or a cancelled request, Whisper stops after its current window and
+        # summaries that have not started are skipped. A Gemini call already running cannot
+        # be interrupted, so it is waited for (not cancelled): the media slot stays held until
+        # every worker thread of this job has returned
+        stop.set()
+        await asyncio.gather(transcription, *summaries, return_exceptions=True)
+
+async def summarize_uploaded_media(file, progress=TRACK_PROGRESS):
+    if file is None:
+        raise _ui_error("⚠️ No file uploaded.")
+
+    # Validate file first
+    file_meta = probe_file(file.name)
+    is_valid, error_msg, ext = validate_media_file(file_meta)
+    if not is_valid:
+        raise _ui_error(error_msg)
+
+    time_estimate = estimate_processing_time(file_meta)
+    progress(0.1, desc=f"Transcribing and summarizing... (Estimated: {time_estimate})")
+    summaries = await _summarize_transcript_windows(file.name)
+    if len(summaries) == 1:
+        yield summaries[0]
+        return
+
+    # Long recordings: merge the per-window summaries into one
+    progress(0.9, desc=PROG_COMBINING)
+    async for partial_summary in backend.summarize_text_stream("\n\n".join(summaries)):
+        yield _raise_on_error(partial_summary)
+
+# --- Callbacks shared by every tab ---
+async def custom_extend(summary, custom_prompt, full=False):
+    # full=True applies the complete prompt validation and requires a summary
+    if full:
+        is_valid, error_msg = validate_custom_prompt(custom_prompt)
+        if not is_valid:
+            raise _ui_error(error_msg)
+        if not summary.strip():
+            raise _ui_error("⚠️ Please provide a summary to extend.")
+    elif not custom_prompt.strip():
+        raise _ui_error("⚠️ Please enter specific details to focus on.")
+
+    async for partial_extension in backend.extend_summary_custom_stream(summary, custom_prompt):
+        yield _raise_on_error(partial_extension)
+
+async def warm_up_backend():
+    # The first import of the AI modules and the sync client warm-up run in a worker thread,
+    # so they do not block the event loop
+    await asyncio.to_thread(lambda: backend.warm_up_model())
+    # The streamed handlers use the async client, which must be created on this event loop
+    await backend.warm_up_model_async()
+
+# Showing/hiding the custom extend section runs in the browser (no server round-trip);
+# the section is hidden by CSS until its "open" class is set
+def _custom_extend_js(group_id, show):
+    action = "add" if show else "remove"
+    return f"() => {{ document.getElementById('{group_id}').classList.{action}('open'); }}"
+
+def build_summary_tab(tab_name, input_component, summarize_fn, custom_extend_fn=custom_extend,
+                      cancel_on_new_input=True, **summarize_options):
+    """Build one summary tab: input_component plus the summary/extend/translate widgets every tab shares"""
+    with gr.Tab(tab_name):
+        # Input components are created with render=False and placed here
+        input_component.render()
+
+        summarize_btn = gr.Button("Summarize", variant="primary")
+        summary_output = gr.Textbox(label="Summary", lines=10)
+
+        with gr.Row():
+            extend_btn = gr.Button("Quick Extend", variant="secondary")
+            custom_extend_btn = gr.Button("Custom Extend", variant="secondary")
+
+        # Custom extend section (collapsible)
+        custom_extend_group_id = "custom-extend-" + tab_name.lower().replace(" ", "-")
+        with gr.Group(elem_id=custom_extend_group_id, elem_classes="custom-extend-group"):
+            gr.Markdown("### Custom Extend Summary")
+            custom_prompt = gr.Textbox(
+                label="What specific details should I focus on?",
+                placeholder="e.g., technical details, examples, statistics, background information, implications...",
+                lines=3
+            )
+            custom_extend_confirm = gr.Button("Extend with Details", variant="primary")
+
+        extended_output = gr.Textbox(label="Extended Summary", lines=10)
+        translate_lang = gr.Dropdown(LANGUAGE_CHOICES, label="Translate to", multiselect=True, allow_custom_value=True, value=["English"])
+        translate_btn = gr.Button("Translate")
+        translated_output = gr.Textbox(label="Translation", lines=10)
+
+        summarize_event = summarize_btn.click(fn=summarize_fn, inputs=input_component, outputs=summary_output, **summarize_options)
+        extend_btn.click(fn=extend_batch, inputs=summary_output, outputs=extended_output, batch=True, max_batch_size=MAX_BATCH_SIZE)
+        custom_extend_btn.click(fn=None, js=_custom_extend_js(custom_extend_group_id, show=True))
+        custom_extend_event = custom_extend_confirm.click(
+            fn=custom_extend_fn, 
+            inputs=[summary_output, custom_prompt], 
+            outputs=extended_output
+        )
+        custom_extend_event.then(fn=None, js=_custom_extend_js(custom_extend_group_id, show=False))
+
+        # Drop jobs that have been superseded: new input cancels a pending summary, and a new
+        # summary cancels a pending custom extend of the old one. Each cancel is a server
+        # request, so it is bound to discrete events (upload/clear, Enter) rather than .change,
+        # which fires on every keystroke; .blur is avoided because clicking Summarize blurs
+        # the textbox and would cancel the job that click starts
+        if cancel_on_new_input:
+            if isinstance(input_component, gr.File):
+                new_input_events = [input_component.upload, input_component.clear]
+            else:
+                new_input_events = [input_component.submit]
+            gr.on(triggers=new_input_events, fn=None, cancels=[summarize_event])
+        summarize_btn.click(fn=None, cancels=[custom_extend_event])
+        translate_btn.click(fn=validate_and_translate_batch, inputs=[summary_output, translate_lang], outputs=translated_output, batch=True, max_batch_size=MAX_BATCH_SIZE)
+
+# Passed to gr.Blocks so it is served in the page <head> rather than as a component
+APP_CSS = """
+.title-text {
+    font-size: 36px;
+    font-weight: bold;
+    color: #2c3e50;
+    text-align: center;
+}
+.custom-extend-group:not(.open) {
+    display: none !important;
+}
+"""
+
+# analytics_enabled=False skips Gradio's telemetry request at startup
+with gr.Blocks(theme=gr.themes.Soft(), css=APP_CSS, analytics_enabled=False) as demo:
     gr.Markdown("<div class='title-text'>SUME - Smart Summarizer</div>")
-    
+
     # Performance controls
     with gr.Row():
         clear_cache_btn = gr.Button("Clear Cache", size="sm")
         cache_stats_btn = gr.Button("Cache Stats", size="sm")
         cache_info = gr.Textbox(label="Cache Information", interactive=False, lines=1)
-    
-    # Progress indicator
-    progress_bar = gr.Progress()
-    
+
     clear_cache_btn.click(fn=clear_cache, outputs=cache_info)
     cache_stats_btn.click(fn=get_cache_stats, outputs=cache_info)
 
+    # Load the Gemini client before the first click rather than during it
+    demo.load(fn=warm_up_backend, concurrency_limit=None)
+
     with gr.Tabs():
         # === TEXT TAB ===
         with gr.Tab("Text"):
             with gr.Tabs():
-                # Text Input Sub-tab
-                with gr.Tab("Direct Text"):
-                    text_input = gr.Textbox(label="Enter text to summarize", lines=8, placeholder="Paste your text here...")
-                    summarize_btn_text = gr.Button("Summarize", variant="primary")
-                    summary_output_text = gr.Textbox(label="Summary", lines=10)
-                    
-                    with gr.Row():
-                        extend_btn_text = gr.Button("Quick Extend", variant="secondary")
-                        custom_extend_btn_text = gr.Button("Custom Extend", variant="secondary")
-                    
-                    # Custom extend section (collapsible)
-                    with gr.Group(visible=False) as custom_extend_group_text:
-                        gr.Markdown("### Custom Extend Summary")
-                        custom_prompt_text = gr.Textbox(
-                            label="What specific details should I focus on?",
-                            placeholder="e.g., technical details, examples, statistics, background information, implications...",
-                            lines=3
-                        )
-                        custom_extend_confirm_text = gr.Button("Extend with Details", variant="primary")
-                    
-                    extended_output_text = gr.Textbox(label="Extended Summary", lines=10)
-                    translate_lang_text = gr.Dropdown(languages_list, label="Translate to", allow_custom_value=True, value="English")
-                    translate_btn_text = gr.Button("Translate")
-                    translated_output_text = gr.Textbox(label="Translation", lines=10)
-
-                    def custom_extend_text(summary, custom_prompt):
-                        # Validate inputs
-                        is_valid, error_msg = validate_custom_prompt(custom_prompt)
-                        if not is_valid:
-                            return error_msg
-                        
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to extend."
-                        
-                        return extend_summary_custom(summary, custom_prompt)
-
-                    def toggle_custom_extend_text():
-                        return gr.Group(visible=True)
-                    
-                    def hide_custom_extend_text():
-                        return gr.Group(visible=False)
-
-                    def validate_and_summarize_text(text, progress=gr.Progress()):
-                        # Validate text input first
-                        is_valid, error_msg = validate_text_input(text)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Summarizing text...")
-                        result = summarize_text(text)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    summarize_btn_text.click(fn=validate_and_summarize_text, inputs=text_input, outputs=summary_output_text)
-                    extend_btn_text.click(fn=extend_summary, inputs=summary_output_text, outputs=extended_output_text)
-                    custom_extend_btn_text.click(fn=toggle_custom_extend_text, outputs=custom_extend_group_text)
-                    custom_extend_confirm_text.click(
-                        fn=custom_extend_text, 
-                        inputs=[summary_output_text, custom_prompt_text], 
-                        outputs=extended_output_text
-                    ).then(fn=hide_custom_extend_text, outputs=custom_extend_group_text)
-                    def validate_and_translate_text(summary, language, progress=gr.Progress()):
-                        # Validate inputs
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to translate."
-                        
-                        is_valid, error_msg = validate_language(language)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Translating text...")
-                        result = translate_text(summary, language)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    translate_btn_text.click(fn=validate_and_translate_text, inputs=[summary_output_text, translate_lang_text], outputs=translated_output_text)
-
-                # File Input Sub-tab
-                with gr.Tab("Text File"):
-                    text_file_input = gr.File(label="Upload text file (.txt, .md, .docx, .pdf)", file_types=[".txt", ".md", ".docx", ".pdf"])
-                    summarize_btn_text_file = gr.Button("Summarize", variant="primary")
-                    summary_output_text_file = gr.Textbox(label="Summary", lines=10)
-                    
-                    with gr.Row():
-                        extend_btn_text_file = gr.Button("Quick Extend", variant="secondary")
-                        custom_extend_btn_text_file = gr.Button("Custom Extend", variant="secondary")
-                    
-                    # Custom extend section (collapsible)
-                    with gr.Group(visible=False) as custom_extend_group_text_file:
-                        gr.Markdown("### Custom Extend Summary")
-                        custom_prompt_text_file = gr.Textbox(
-                            label="What specific details should I focus on?",
-                            placeholder="e.g., technical details, examples, statistics, background information, implications...",
-                            lines=3
-                        )
-                        custom_extend_confirm_text_file = gr.Button("Extend with Details", variant="primary")
-                    
-                    extended_output_text_file = gr.Textbox(label="Extended Summary", lines=10)
-                    translate_lang_text_file = gr.Dropdown(languages_list, label="Translate to", allow_custom_value=True, value="English")
-                    translate_btn_text_file = gr.Button("Translate")
-                    translated_output_text_file = gr.Textbox(label="Translation", lines=10)
-
-                    def summarize_text_file(file, progress=gr.Progress()):
-                        if file is None:
-                            return "⚠️ No file uploaded."
-                        
-                        try:
-                            # Validate file first
-                            is_valid, error_msg, ext = validate_file_input(file.name)
-                            if not is_valid:
-                                return error_msg
-                            
-                            # Show processing time estimate
-                            time_estimate = estimate_processing_time(file.name)
-                            progress(0.1, desc=f"Processing file... (Estimated: {time_estimate})")
-                            
-                            # Use the specialized summarize_file function
-                            progress(0.5, desc="Summarizing content...")
-                            result = summarize_file(file.name)
-                            
-                            progress(1.0, desc="Complete!")
-                            return result
-                        except Exception as e:
-                            return f"⚠️ Error processing file: {e}"
-
-                    def custom_extend_text_file(summary, custom_prompt):
-                        if not custom_prompt.strip():
-                            return "⚠️ Please enter specific details to focus on."
-                        return extend_summary_custom(summary, custom_prompt)
-
-                    def toggle_custom_extend_text_file():
-                        return gr.Group(visible=True)
-                    
-                    def hide_custom_extend_text_file():
-                        return gr.Group(visible=False)
-
-                    summarize_btn_text_file.click(fn=summarize_text_file, inputs=text_file_input, outputs=summary_output_text_file)
-                    extend_btn_text_file.click(fn=extend_summary, inputs=summary_output_text_file, outputs=extended_output_text_file)
-                    custom_extend_btn_text_file.click(fn=toggle_custom_extend_text_file, outputs=custom_extend_group_text_file)
-                    custom_extend_confirm_text_file.click(
-                        fn=custom_extend_text_file, 
-                        inputs=[summary_output_text_file, custom_prompt_text_file], 
-                        outputs=extended_output_text_file
-                    ).then(fn=hide_custom_extend_text_file, outputs=custom_extend_group_text_file)
-                    def validate_and_translate_text_file(summary, language, progress=gr.Progress()):
-                        # Validate inputs
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to translate."
-                        
-                        is_valid, error_msg = validate_language(language)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Translating text...")
-                        result = translate_text(summary, language)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    translate_btn_text_file.click(fn=validate_and_translate_text_file, inputs=[summary_output_text_file, translate_lang_text_file], outputs=translated_output_text_file)
-
-                # URL Input Sub-tab
-                with gr.Tab("Webpage URL"):
-                    url_input = gr.Textbox(label="Enter webpage URL", placeholder="https://example.com/article")
-                    summarize_btn_url = gr.Button("Summarize", variant="primary")
-                    summary_output_url = gr.Textbox(label="Summary", lines=10)
-                    
-                    with gr.Row():
-                        extend_btn_url = gr.Button("Quick Extend", variant="secondary")
-                        custom_extend_btn_url = gr.Button("Custom Extend", variant="secondary")
-                    
-                    # Custom extend section (collapsible)
-                    with gr.Group(visible=False) as custom_extend_group_url:
-                        gr.Markdown("### 🎯 Custom Extend Summary")
-                        custom_prompt_url = gr.Textbox(
-                            label="What specific details should I focus on?",
-                            placeholder="e.g., technical details, examples, statistics, background information, implications...",
-                            lines=3
-                        )
-                        custom_extend_confirm_url = gr.Button("Extend with Details", variant="primary")
-                    
-                    extended_output_url = gr.Textbox(label="Extended Summary", lines=10)
-                    translate_lang_url = gr.Dropdown(languages_list, label="Translate to", allow_custom_value=True, value="English")
-                    translate_btn_url = gr.Button("Translate")
-                    translated_output_url = gr.Textbox(label="Translation", lines=10)
-
-                    def summarize_url(url, progress=gr.Progress()):
-                        # Validate URL first
-                        is_valid, error_msg = validate_url(url)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.2, desc="Fetching webpage content...")
-                        text = get_text_from_url(url, "Webpage")
-                        if text.startswith("⚠️"):
-                            return text
-                        
-                        progress(0.6, desc="Summarizing content...")
-                        result = summarize_text(text)
-                        
-                        progress(1.0, desc="Complete!")
-                        return result
-
-                    def custom_extend_url(summary, custom_prompt):
-                        if not custom_prompt.strip():
-                            return "⚠️ Please enter specific details to focus on."
-                        return extend_summary_custom(summary, custom_prompt)
-
-                    def toggle_custom_extend_url():
-                        return gr.Group(visible=True)
-                    
-                    def hide_custom_extend_url():
-                        return gr.Group(visible=False)
-
-                    summarize_btn_url.click(fn=summarize_url, inputs=url_input, outputs=summary_output_url)
-                    extend_btn_url.click(fn=extend_summary, inputs=summary_output_url, outputs=extended_output_url)
-                    custom_extend_btn_url.click(fn=toggle_custom_extend_url, outputs=custom_extend_group_url)
-                    custom_extend_confirm_url.click(
-                        fn=custom_extend_url, 
-                        inputs=[summary_output_url, custom_prompt_url], 
-                        outputs=extended_output_url
-                    ).then(fn=hide_custom_extend_url, outputs=custom_extend_group_url)
-                    def validate_and_translate_url(summary, language, progress=gr.Progress()):
-                        # Validate inputs
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to translate."
-                        
-                        is_valid, error_msg = validate_language(language)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Translating text...")
-                        result = translate_text(summary, language)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    translate_btn_url.click(fn=validate_and_translate_url, inputs=[summary_output_url, translate_lang_url], outputs=translated_output_url)
+                build_summary_tab(
+                    "Direct Text",
+                    gr.Textbox(label="Enter text to summarize", lines=8, placeholder="Paste your text here...", render=False),
+                    validate_and_summarize_text,
+                    custom_extend_fn=partial(custom_extend, full=True)
+                )
+                build_summary_tab(
+                    "Text File",
+                    gr.File(label="Upload text file (.txt, .md, .docx, .pdf)", file_types=[".txt", ".md", ".docx", ".pdf"], render=False),
+                    summarize_text_file
+                )
+                build_summary_tab(
+                    "Webpage URL",
+                    gr.Textbox(label="Enter webpage URL", placeholder="https://example.com/article", render=False),
+                    summarize_url
+                )
 
         # === MEDIA TAB ===
         with gr.Tab("Media"):
             with gr.Tabs():
-                # Video/Audio URL Sub-tab
-                with gr.Tab("Media URL"):
-                    media_url_input = gr.Textbox(label="Enter media URL (YouTube, etc.)", placeholder="https://youtube.com/watch?v=...")
-                    summarize_btn_media_url = gr.Button("Summarize", variant="primary")
-                    summary_output_media_url = gr.Textbox(label="Summary", lines=10)
-                    
-                    with gr.Row():
-                        extend_btn_media_url = gr.Button("Quick Extend", variant="secondary")
-                        custom_extend_btn_media_url = gr.Button("Custom Extend", variant="secondary")
-                    
-                    # Custom extend section (collapsible)
-                    with gr.Group(visible=False) as custom_extend_group_media_url:
-                        gr.Markdown("### Custom Extend Summary")
-                        custom_prompt_media_url = gr.Textbox(
-                            label="What specific details should I focus on?",
-                            placeholder="e.g., technical details, examples, statistics, background information, implications...",
-                            lines=3
-                        )
-                        custom_extend_confirm_media_url = gr.Button("Extend with Details", variant="primary")
-                    
-                    extended_output_media_url = gr.Textbox(label="Extended Summary", lines=10)
-                    translate_lang_media_url = gr.Dropdown(languages_list, label="Translate to", allow_custom_value=True, value="English")
-                    translate_btn_media_url = gr.Button("Translate")
-                    translated_output_media_url = gr.Textbox(label="Translation", lines=10)
-
-                    def summarize_media_url(url):
-                        if not url:
-                            return "⚠️ Please enter a media URL."
-                        text = get_text_from_url(url, "Media")
-                        if text.startswith("⚠️"):
-                            return text
-                        return summarize_text(text)
-
-                    def custom_extend_media_url(summary, custom_prompt):
-                        if not custom_prompt.strip():
-                            return "⚠️ Please enter specific details to focus on."
-                        return extend_summary_custom(summary, custom_prompt)
-
-                    def toggle_custom_extend_media_url():
-                        return gr.Group(visible=True)
-                    
-                    def hide_custom_extend_media_url():
-                        return gr.Group(visible=False)
-
-                    summarize_btn_media_url.click(fn=summarize_media_url, inputs=media_url_input, outputs=summary_output_media_url)
-                    extend_btn_media_url.click(fn=extend_summary, inputs=summary_output_media_url, outputs=extended_output_media_url)
-                    custom_extend_btn_media_url.click(fn=toggle_custom_extend_media_url, outputs=custom_extend_group_media_url)
-                    custom_extend_confirm_media_url.click(
-                        fn=custom_extend_media_url, 
-                        inputs=[summary_output_media_url, custom_prompt_media_url], 
-                        outputs=extended_output_media_url
-                    ).then(fn=hide_custom_extend_media_url, outputs=custom_extend_group_media_url)
-                    def validate_and_translate_media_url(summary, language, progress=gr.Progress()):
-                        # Validate inputs
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to translate."
-                        
-                        is_valid, error_msg = validate_language(language)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Translating text...")
-                        result = translate_text(summary, language)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    translate_btn_media_url.click(fn=validate_and_translate_media_url, inputs=[summary_output_media_url, translate_lang_media_url], outputs=translated_output_media_url)
-
-                # File Upload Sub-tab
-                with gr.Tab("File Upload"):
-                    media_input = gr.File(label="Upload Media File (Audio/Video)", file_types=["audio", "video"])
-                    summarize_btn_media = gr.Button("Summarize", variant="primary")
-                    summary_output_media = gr.Textbox(label="Summary", lines=10)
-                    
-                    with gr.Row():
-                        extend_btn_media = gr.Button("Quick Extend", variant="secondary")
-                        custom_extend_btn_media = gr.Button("Custom Extend", variant="secondary")
-                    
-                    # Custom extend section (collapsible)
-                    with gr.Group(visible=False) as custom_extend_group_media:
-                        gr.Markdown("### Custom Extend Summary")
-                        custom_prompt_media = gr.Textbox(
-                            label="What specific details should I focus on?",
-                            placeholder="e.g., technical details, examples, statistics, background information, implications...",
-                            lines=3
-                        )
-                        custom_extend_confirm_media = gr.Button("Extend with Details", variant="primary")
-                    
-                    extended_output_media = gr.Textbox(label="Extended Summary", lines=10)
-                    translate_lang_media = gr.Dropdown(languages_list, label="Translate to", allow_custom_value=True, value="English")
-                    translate_btn_media = gr.Button("Translate")
-                    translated_output_media = gr.Textbox(label="Translation", lines=10)
-
-                    def summarize_uploaded_media(file, progress=gr.Progress()):
-                        if file is None:
-                            return "⚠️ No file uploaded."
-                        
-                        try:
-                            # Validate file first
-                            from backend.validation import validate_media_file, estimate_processing_time
-                            is_valid, error_msg, ext = validate_media_file(file.name)
-                            if not is_valid:
-                                return error_msg
-                            
-                            # Show processing time estimate
-                            time_estimate = estimate_processing_time(file.name)
-                            progress(0.1, desc=f"Processing media... (Estimated: {time_estimate})")
-                            
-                            from backend import speech_to_text
-                            progress(0.3, desc="Converting speech to text...")
-                            transcript = speech_to_text(file.name)
-                            
-                            if transcript.startswith("⚠️"):
-                                return transcript
-                            
-                            progress(0.7, desc="Summarizing transcript...")
-                            result = summarize_text(transcript)
-                            
-                            progress(1.0, desc="Complete!")
-                            return result
-                        except Exception as e:
-                            return f"⚠️ Error processing media: {e}"
-
-                    def custom_extend_media(summary, custom_prompt):
-                        if not custom_prompt.strip():
-                            return "⚠️ Please enter specific details to focus on."
-                        return extend_summary_custom(summary, custom_prompt)
-
-                    def toggle_custom_extend_media():
-                        return gr.Group(visible=True)
-                    
-                    def hide_custom_extend_media():
-                        return gr.Group(visible=False)
-
-                    summarize_btn_media.click(fn=summarize_uploaded_media, inputs=media_input, outputs=summary_output_media)
-                    extend_btn_media.click(fn=extend_summary, inputs=summary_output_media, outputs=extended_output_media)
-                    custom_extend_btn_media.click(fn=toggle_custom_extend_media, outputs=custom_extend_group_media)
-                    custom_extend_confirm_media.click(
-                        fn=custom_extend_media, 
-                        inputs=[summary_output_media, custom_prompt_media], 
-                        outputs=extended_output_media
-                    ).then(fn=hide_custom_extend_media, outputs=custom_extend_group_media)
-                    def validate_and_translate_media(summary, language, progress=gr.Progress()):
-                        # Validate inputs
-                        if not summary.strip():
-                            return "⚠️ Please provide a summary to translate."
-                        
-                        is_valid, error_msg = validate_language(language)
-                        if not is_valid:
-                            return error_msg
-                        
-                        progress(0.3, desc="Translating text...")
-                        result = translate_text(summary, language)
-                        progress(1.0, desc="Complete!")
-                        return result
-                    
-                    translate_btn_media.click(fn=validate_and_translate_media, inputs=[summary_output_media, translate_lang_media], outputs=translated_output_media)
+                build_summary_tab(
+                    "Media URL",
+                    gr.Textbox(label="Enter media URL (YouTube, etc.)", placeholder="https://youtube.com/watch?v=...", render=False),
+                    summarize_media_url,
+                    # Cancelling would not stop the download/transcription running in its worker
+                    # thread, only free the media slot for a second job alongside it
+                    cancel_on_new_input=False,
+                    concurrency_limit=MEDIA_CONCURRENCY,
+                    concurrency_id=MEDIA_CONCURRENCY_ID
+                )
+                build_summary_tab(
+                    "File Upload",
+                    gr.File(label="Upload Media File (Audio/Video)", file_types=["audio", "video"], render=False),
+                    summarize_uploaded_media,
+                    concurrency_limit=MEDIA_CONCURRENCY,
+                    concurrency_id=MEDIA_CONCURRENCY_ID
+                )
 
 def main():
     """Main entry point for SUME application"""
-    demo.launch()
+    # Load Whisper in the background while the server starts, so the first
+    # media request does not pay for the model load; the attribute is looked up inside
+    # the thread so importing the media modules does not delay launch()
+    threading.Thread(target=lambda: backend.warm_up_whisper(), daemon=True).start()
+    # The UI is the only client, so the API docs page and its schema are not generated
+    demo.queue(default_concurrency_limit=QUEUE_CONCURRENCY, max_size=QUEUE_MAX_SIZE).launch(quiet=True, show_api=False)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
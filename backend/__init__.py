@@ -1,28 +1,72 @@
 # Backend package for SUME Smart Summarizer
-from .ai_services import summarize_text, extend_summary, extend_summary_custom, translate_text, summarize_file
-from .languages import languages_list
-from .media_processor import speech_to_text, transcribe_media_url
-from .web_scraper import get_text_from_url
+import importlib
+
+from .errors import SumeError
+from .languages import languages_list, languages_set
 from .cache_manager import clear_cache, get_cache_stats, get_cache_info
 from .validation import (
-    validate_text_input, validate_file_input, validate_media_file, 
+    validate_text_input, validate_file_input, validate_media_file,
     validate_url, validate_language, validate_custom_prompt,
-    estimate_processing_time, get_file_type_info
+    estimate_processing_time, get_file_type_info, FileMeta, probe_file
 )
 
+# Modules that pull in Gemini, Whisper, yt-dlp, etc. are imported on first
+# attribute access so the app can start serving before they are loaded
+_LAZY_EXPORTS = {
+    'summarize_text': 'ai_services',
+    'summarize_text_stream': 'ai_services',
+    'extend_summary': 'ai_services',
+    'extend_summary_custom': 'ai_services',
+    'extend_summary_custom_stream': 'ai_services',
+    'translate_text': 'ai_services',
+    'summarize_file': 'ai_services',
+    'extend_summaries': 'ai_services',
+    'translate_text_multi': 'ai_services',
+    'translate_texts_multi': 'ai_services',
+    'warm_up_model': 'ai_services',
+    'warm_up_model_async': 'ai_services',
+    'speech_to_text': 'media_processor',
+    'speech_to_text_windows': 'media_processor',
+    'transcribe_media_url': 'media_processor',
+    'warm_up_whisper': 'media_processor',
+    'get_text_from_url': 'web_scraper',
+    'get_texts_from_urls': 'web_scraper',
+}
+
+def __getattr__(name):
+    """Resolve heavy exports lazily (PEP 562)"""
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
 __all__ = [
     'summarize_text',
-    'extend_summary', 
+    'summarize_text_stream',
+    'extend_summary',
     'extend_summary_custom',
+    'extend_summary_custom_stream',
     'translate_text',
     'summarize_file',
+    'extend_summaries',
+    'translate_text_multi',
+    'translate_texts_multi',
+    'warm_up_model',
+    'warm_up_model_async',
     'speech_to_text',
+    'speech_to_text_windows',
     'transcribe_media_url',
+    'warm_up_whisper',
     'get_text_from_url',
+    'get_texts_from_urls',
+    'SumeError',
     'clear_cache',
     'get_cache_stats',
     'get_cache_info',
     'languages_list',
+    'languages_set',
     'validate_text_input',
     'validate_file_input',
     'validate_media_file',
@@ -30,5 +74,7 @@ __all__ = [
     'validate_language',
     'validate_custom_prompt',
     'estimate_processing_time',
-    'get_file_type_info'
+    'get_file_type_info',
+    'FileMeta',
+    'probe_file'
 ]
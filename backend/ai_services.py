@@ -2,12 +2,56 @@
 AI Services module for SUME Smart Summarizer
 Handles text summarization, extension, and translation using Google Gemini
 """
+import json
+import re
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Sequence
 from .config import model
-from .cache_manager import cache_result
+from .cache_manager import cache_result, cache_by_file_content, get_cached_result, store_result
+from .errors import SumeError
 from .file_reader import extract_text_from_file, chunk_text
 
+# Maximum number of Gemini requests in flight for one batch
+BATCH_MAX_WORKERS = 8
+# File chunks summarized together in one Gemini request
+CHUNKS_PER_REQUEST = 4
+
+def _run_concurrently(func, *iterables) -> List[str]:
+    """Apply func to each item of the iterables in a thread pool, preserving order"""
+    with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+        return list(executor.map(func, *iterables))
+
+_model_warmed_up = False
+
+def warm_up_model() -> None:
+    """Prime the Gemini client (auth, connection) so the first real request is not slowed down"""
+    global _model_warmed_up
+    if _model_warmed_up:
+        return
+    try:
+        # count_tokens is free and goes through the same client as generate_content
+        model.count_tokens("warm up")
+    except Exception as e:
+        logging.warning(f"Gemini warm-up failed: {e}")
+    _model_warmed_up = True
+
+_async_model_warmed_up = False
+
+async def warm_up_model_async() -> None:
+    """Prime the async Gemini client used by the streaming functions; await it on the app's event loop"""
+    global _async_model_warmed_up
+    if _async_model_warmed_up:
+        return
+    try:
+        # generate_content_async has its own client (bound to the running loop), separate from the sync one
+        await model.count_tokens_async("warm up")
+    except Exception as e:
+        logging.warning(f"Gemini async warm-up failed: {e}")
+    _async_model_warmed_up = True
+
 # --- Summarize, Extend, Translate ---
-@cache_result()
+@cache_result(normalize=True)
 def summarize_text(input_text: str) -> str:
     """Summarize input text using Google Gemini"""
     try:
@@ -16,17 +60,77 @@ def summarize_text(input_text: str) -> str:
     except Exception as e:
         return f"⚠️ Summarization error: {e}"
 
+async def _stream_cached(func_name: str, args: tuple, prompt: str, error_label: str, failed_msg: str):
+    """Stream a Gemini response as accumulated text, sharing cache entries with func_name"""
+    cached = get_cached_result(func_name, args)
+    if cached is not None:
+        yield cached
+        return
+
+    text = ""
+    try:
+        resp = await model.generate_content_async(prompt, stream=True)
+        async for chunk in resp:
+            text += chunk.text
+            yield text
+    except Exception as e:
+        yield f"⚠️ {error_label} error: {e}"
+        return
+
+    if not text.strip():
+        yield failed_msg
+        return
+    store_result(func_name, args, None, text.strip())
+    yield text.strip()
+
+def summarize_text_stream(input_text: str):
+    """Summarize input text with Google Gemini, yielding the summary as it is generated"""
+    return _stream_cached(
+        "summarize_text", (input_text,),
+        f"Summarize the following text:\n\n{input_text}",
+        "Summarization", "⚠️ Summarization failed."
+    )
+
+@cache_by_file_content()
 def summarize_file(file_path):
     """Summarize a file by processing it in chunks"""
-    text = extract_text_from_file(file_path)
-    if text.startswith("⚠️"):
-        return text
+    try:
+        return _summarize_in_chunks(extract_text_from_file(file_path))
+    except SumeError as e:
+        return e.message
 
-    summaries = []
-    for chunk in chunk_text(text):
-        resp = model.generate_content(f"Summarize the following text:\n\n{chunk}")
-        if resp and resp.text:
-            summaries.append(resp.text.strip())
+def _summarize_chunk(chunk: str) -> str:
+    """Summarize one chunk of a larger text; empty string if Gemini returned nothing"""
+    resp = model.generate_content(f"Summarize the following text:\n\n{chunk}")
+    return resp.text.strip() if resp and resp.text else ""
+
+def _summarize_chunk_group(chunks: List[str]) -> List[str]:
+    """Summarize several chunks with one Gemini request, returning one summary per chunk"""
+    if len(chunks) == 1:
+        return [_summarize_chunk(chunks[0])]
+
+    sections = "\n\n".join(f"---SECTION {i}---\n{chunk}" for i, chunk in enumerate(chunks, 1))
+    prompt = (
+        "Summarize each of the following sections separately. "
+        f"Return only a JSON array of {len(chunks)} strings, one summary per section, in order.\n\n{sections}"
+    )
+    try:
+        resp = model.generate_content(prompt, generation_config={"response_mime_type": "application/json"})
+        summaries = json.loads(resp.text)
+        if (isinstance(summaries, list) and len(summaries) == len(chunks)
+                and all(isinstance(summary, str) for summary in summaries)):
+            return [summary.strip() for summary in summaries]
+    except ValueError as e:
+        logging.warning(f"Grouped chunk summary unusable, retrying per chunk: {e}")
+    # Malformed or mismatched response: fall back to one request per chunk
+    return [_summarize_chunk(chunk) for chunk in chunks]
+
+def _summarize_in_chunks(text: str) -> str:
+    """Summarize extracted text chunk by chunk"""
+    # Chunks are sent CHUNKS_PER_REQUEST at a time and the requests run concurrently (order is preserved)
+    chunks = list(chunk_text(text))
+    groups = [chunks[i:i + CHUNKS_PER_REQUEST] for i in range(0, len(chunks), CHUNKS_PER_REQUEST)]
+    summaries = [summary for group in _run_concurrently(_summarize_chunk_group, groups) for summary in group if summary]
 
     if len(summaries) == 0:
         return "⚠️ Summarization failed."
@@ -35,7 +139,7 @@ def summarize_file(file_path):
     final_summary = "\n\n".join(summaries)
     return final_summary
 
-@cache_result()
+@cache_result(normalize=True)
 def extend_summary(summary_text: str) -> str:
     """Extend a summary with more details"""
     try:
@@ -44,7 +148,7 @@ def extend_summary(summary_text: str) -> str:
     except Exception as e:
         return f"⚠️ Extend summary error: {e}"
 
-@cache_result()
+@cache_result(normalize=True)
 def extend_summary_custom(summary_text: str, custom_prompt: str) -> str:
     """Extend a summary with custom focus areas"""
     try:
@@ -54,7 +158,15 @@ def extend_summary_custom(summary_text: str, custom_prompt: str) -> str:
     except Exception as e:
         return f"⚠️ Custom extend summary error: {e}"
 
-@cache_result()
+def extend_summary_custom_stream(summary_text: str, custom_prompt: str):
+    """Extend a summary with custom focus areas, yielding the text as it is generated"""
+    return _stream_cached(
+        "extend_summary_custom", (summary_text, custom_prompt),
+        f"Expand the following summary with specific focus on: {custom_prompt}\n\nSummary:\n{summary_text}",
+        "Custom extend summary", "⚠️ Could not extend summary with custom details."
+    )
+
+@cache_result(normalize=True)
 def translate_text(summary_text: str, target_lang: str) -> str:
     """Translate text to target language"""
     try:
@@ -62,3 +174,42 @@ def translate_text(summary_text: str, target_lang: str) -> str:
         return resp.text.strip() if resp and resp.text else "⚠️ Translation failed."
     except Exception as e:
         return f"⚠️ Translation error: {e}"
+
+def _split_translations(text: str, target_langs: Sequence[str]) -> Dict[str, str]:
+    """Split a multi-language response into {language: translation}"""
+    # Only "### <requested language>" lines count as section headers, so
+    # headings inside the translated text are left alone
+    names = "|".join(re.escape(lang) for lang in target_langs)
+    header = re.compile(rf"^#{{1,6}}[ \t]*({names})[ \t]*$", re.MULTILINE | re.IGNORECASE)
+    # re.split with one group gives [preamble, lang1, body1, lang2, body2, ...]
+    parts = header.split(text)
+    sections = {lang.strip().lower(): body.strip() for lang, body in zip(parts[1::2], parts[2::2])}
+    return {lang: sections.get(lang.lower()) or "⚠️ Translation missing." for lang in target_langs}
+
+@cache_result(normalize=True)
+def translate_text_multi(summary_text: str, target_langs: Sequence[str]) -> Dict[str, str]:
+    """Translate text into several languages with a single Gemini request"""
+    if len(target_langs) == 1:
+        return {target_langs[0]: translate_text(summary_text, target_langs[0])}
+    try:
+        prompt = (
+            f"Translate the following text into each of these languages: {', '.join(target_langs)}.\n"
+            "Start each translation with a line containing only '### ' followed by the language name, "
+            "exactly as written above.\n\n"
+            f"{summary_text}"
+        )
+        resp = model.generate_content(prompt)
+        if not (resp and resp.text):
+            return {lang: "⚠️ Translation failed." for lang in target_langs}
+        return _split_translations(resp.text, target_langs)
+    except Exception as e:
+        return {lang: f"⚠️ Translation error: {e}" for lang in target_langs}
+
+# --- Batch variants (used by the batched Gradio events) ---
+def extend_summaries(summary_texts: List[str]) -> List[str]:
+    """Extend a batch of summaries with concurrent Gemini requests"""
+    return _run_concurrently(extend_summary, summary_texts)
+
+def translate_texts_multi(summary_texts: List[str], target_langs: List[Sequence[str]]) -> List[Dict[str, str]]:
+    """Translate a batch of texts, each into its own list of target languages"""
+    return _run_concurrently(translate_text_multi, summary_texts, target_langs)
@@ -1,114 +1,218 @@
 """
 Cache management module for SUME Smart Summarizer
-Handles in-memory caching for performance optimization with TTL and size limits
+Handles persistent on-disk caching for performance optimization with TTL and size limits
 """
-import hashlib
+import contextvars
+import os
+import re
+import sys
+import threading
 import time
+from blake3 import blake3
 import json
-from functools import wraps
-from typing import Any, Dict, Optional
+from functools import lru_cache, wraps
+from typing import Any, Optional
+from cachetools import TLRUCache
+from diskcache import Cache
 
-# Enhanced cache with TTL and size management
-cache: Dict[str, Dict[str, Any]] = {}
-CACHE_MAX_SIZE = 1000  # Maximum number of cached items
+CACHE_DIR = os.getenv("SUME_CACHE_DIR", ".sume_cache")
+CACHE_SIZE_LIMIT = 2 ** 30  # Maximum cache size on disk (1 GB)
 CACHE_TTL = 3600  # Time to live in seconds (1 hour)
+MEMORY_CACHE_MAX_BYTES = 64 * 1024 * 1024  # Memory budget of the in-memory tier
+MEMORY_CACHE_MAX_ITEM_BYTES = 1024 * 1024  # Larger results (documents, transcripts) stay on disk only
+FILE_HASH_CHUNK_SIZE = 1024 * 1024  # Read size when hashing file content
 
-class CacheItem:
-    """Cache item with timestamp and data"""
-    def __init__(self, data: Any, ttl: int = CACHE_TTL):
-        self.data = data
-        self.timestamp = time.time()
-        self.ttl = ttl
-    
-    def is_expired(self) -> bool:
-        """Check if cache item has expired"""
-        return time.time() - self.timestamp > self.ttl
-    
-    def get_data(self) -> Any:
-        """Get data if not expired, otherwise return None"""
-        return self.data if not self.is_expired() else None
+# SQLite-backed cache that survives restarts; diskcache handles expiry and LRU eviction
+cache = Cache(CACHE_DIR, size_limit=CACHE_SIZE_LIMIT, eviction_policy="least-recently-used")
+cache.stats(enable=True)
+
+def _memory_entry_size(entry) -> int:
+    """Approximate memory held by a (result, expires_at) entry of the in-memory tier"""
+    result, _ = entry
+    if isinstance(result, dict):
+        return sum(sys.getsizeof(name) + sys.getsizeof(value) for name, value in result.items())
+    return sys.getsizeof(result)
+
+# In-memory tier in front of the disk cache so hot entries skip SQLite and unpickling. It is
+# bounded by bytes, not item count, and each entry expires together with its disk copy
+# (entries are (result, expires_at) pairs); TLRUCache is not thread-safe, hence the lock
+memory_cache = TLRUCache(
+    maxsize=MEMORY_CACHE_MAX_BYTES,
+    ttu=lambda _key, entry, _now: entry[1],
+    timer=time.time,
+    getsizeof=_memory_entry_size
+)
+_memory_lock = threading.Lock()
+
+# Functions whose string arguments are keyed in normalized form (see normalize_text)
+_NORMALIZED_FUNCS = set()
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+def normalize_text(text: str) -> str:
+    """Canonical form of a text for cache keys: collapsed spaces, trimmed lines, at most one blank line"""
+    lines = (" ".join(line.split()) for line in text.strip().splitlines())
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines))
+
+def _hash_value(hasher, value: Any):
+    """Feed one argument into the hasher, length-prefixed and tagged with its type"""
+    # Strings are hashed as-is; repr() would build an escaped copy of large texts
+    data = value.encode() if isinstance(value, str) else repr(value).encode()
+    hasher.update(f"{type(value).__name__}:{len(data)}:".encode())
+    hasher.update(data)
+
+@lru_cache(maxsize=None)
+def _base_hasher(func_name: str):
+    """Hasher already fed with func_name; built once per function and copied for each key"""
+    # The cache is persistent and shared between users, so keys need a collision-resistant
+    # hash; BLAKE3 is cryptographic and still several times faster than SHA-256 or BLAKE2b
+    return blake3(func_name.encode())
 
 def _create_cache_key(func_name: str, args: tuple, kwargs: dict) -> str:
-    """Create a more robust cache key"""
+    """Create a cache key by hashing each argument into a 256-bit BLAKE3 digest"""
+    hasher = _base_hasher(func_name).copy()
+    # Inputs that differ only in whitespace share an entry
+    if func_name in _NORMALIZED_FUNCS:
+        args = tuple(normalize_text(arg) if isinstance(arg, str) else arg for arg in args)
+    for arg in args:
+        _hash_value(hasher, arg)
     # Sort kwargs for consistent key generation
-    sorted_kwargs = sorted(kwargs.items()) if kwargs else []
-    key_data = f"{func_name}_{args}_{sorted_kwargs}"
-    return hashlib.sha256(key_data.encode()).hexdigest()[:16]
-
-def _cleanup_expired():
-    """Remove expired items from cache"""
-    global cache
-    expired_keys = [key for key, item in cache.items() if item.is_expired()]
-    for key in expired_keys:
-        del cache[key]
-
-def _enforce_size_limit():
-    """Remove oldest items if cache exceeds size limit"""
-    global cache
-    if len(cache) > CACHE_MAX_SIZE:
-        # Sort by timestamp and remove oldest items
-        sorted_items = sorted(cache.items(), key=lambda x: x[1].timestamp)
-        items_to_remove = len(cache) - CACHE_MAX_SIZE
-        for key, _ in sorted_items[:items_to_remove]:
-            del cache[key]
-
-def cache_result(ttl: int = CACHE_TTL):
-    """Enhanced cache decorator with TTL and size management"""
+    if kwargs:
+        for name, value in sorted(kwargs.items()):
+            _hash_value(hasher, name)
+            _hash_value(hasher, value)
+    return hasher.hexdigest()
+
+def _remember(key: str, result: Any, expires_at: float):
+    """Put a result in the memory tier unless it is too large for it"""
+    entry = (result, expires_at)
+    if _memory_entry_size(entry) > MEMORY_CACHE_MAX_ITEM_BYTES:
+        return
+    with _memory_lock:
+        memory_cache[key] = entry
+
+def get_cached_result(func_name: str, args: tuple, kwargs: Optional[dict] = None) -> Optional[Any]:
+    """Get the cached result of func_name(*args, **kwargs), or None if missing or expired"""
+    key = _create_cache_key(func_name, args, kwargs or {})
+    with _memory_lock:
+        entry = memory_cache.get(key)
+    if entry is not None:
+        return entry[0]
+    
+    result, expires_at = cache.get(key, expire_time=True)
+    if result is not None:
+        # Promoted entries keep the disk entry's remaining lifetime, not a fresh one
+        _remember(key, result, expires_at or time.time() + CACHE_TTL)
+    return result
+
+def store_result(func_name: str, args: tuple, kwargs: Optional[dict], result: Any, ttl: int = CACHE_TTL):
+    """Cache the result of func_name(*args, **kwargs)"""
+    key = _create_cache_key(func_name, args, kwargs or {})
+    cache.set(key, result, expire=ttl)
+    _remember(key, result, time.time() + ttl)
+
+def _is_error(result: Any) -> bool:
+    """Whether a result is, or contains, a "⚠️ ..." error message, which must not be cached"""
+    if isinstance(result, str):
+        return result.startswith("⚠️")
+    # Per-language results (translate_text_multi): one failed language fails the whole entry
+    if isinstance(result, dict):
+        return any(_is_error(value) for value in result.values())
+    return False
+
+def cache_result(ttl: int = CACHE_TTL, normalize: bool = False):
+    """Enhanced cache decorator with TTL and size management; normalize=True keys text arguments by normalize_text"""
     def decorator(func):
+        if normalize:
+            _NORMALIZED_FUNCS.add(func.__name__)
         @wraps(func)
         def wrapper(*args, **kwargs):
-            # Clean up expired items first
-            _cleanup_expired()
-            
-            # Create cache key
-            cache_key = _create_cache_key(func.__name__, args, kwargs)
-            
             # Check if item exists and is not expired
-            if cache_key in cache:
-                cached_item = cache[cache_key]
-                if not cached_item.is_expired():
-                    return cached_item.get_data()
+            cached = get_cached_result(func.__name__, args, kwargs)
+            if cached is not None:
+                return cached
             
-            # Execute function and cache result
+            # Execute function and cache result with TTL
             result = func(*args, **kwargs)
+            if not _is_error(result):
+                store_result(func.__name__, args, kwargs, result, ttl)
+            return result
+        return wrapper
+    return decorator
+
+def file_digest(file_path: str) -> str:
+    """BLAKE3 hex digest of a file's content, read in chunks"""
+    # Large media files are hashed on several cores
+    hasher = blake3(max_threads=blake3.AUTO)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(FILE_HASH_CHUNK_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+# (file_path, digest) of the file being processed by a cache_by_file_content function, so
+# nested content-cached calls on the same file (summarize_file -> extract_text_from_file)
+# hash it only once
+_current_file_digest = contextvars.ContextVar("_current_file_digest", default=None)
+
+def file_cache_key(file_path: str) -> tuple:
+    """Cache key arguments for a file: content digest plus lower-cased extension"""
+    # The extension matters: the same bytes extract differently as .md and .txt
+    current = _current_file_digest.get()
+    digest = current[1] if current and current[0] == file_path else file_digest(file_path)
+    return (digest, os.path.splitext(file_path)[1].lower())
+
+def cache_by_file_content(ttl: int = CACHE_TTL):
+    """Cache decorator keyed on the content and extension of the file passed as first argument, not its path"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(file_path, *args, **kwargs):
+            # Re-uploads of the same file get a new temp path but the same digest
+            try:
+                file_key = file_cache_key(file_path)
+            except OSError:
+                return func(file_path, *args, **kwargs)
+            key_args = file_key + args
+            cached = get_cached_result(func.__name__, key_args, kwargs)
+            if cached is not None:
+                return cached
             
-            # Store in cache with TTL
-            cache[cache_key] = CacheItem(result, ttl)
-            
-            # Enforce size limit
-            _enforce_size_limit()
-            
+            token = _current_file_digest.set((file_path, file_key[0]))
+            try:
+                result = func(file_path, *args, **kwargs)
+            finally:
+                _current_file_digest.reset(token)
+            if not _is_error(result):
+                store_result(func.__name__, key_args, kwargs, result, ttl)
             return result
         return wrapper
     return decorator
 
 def clear_cache():
-    """Clear the in-memory cache"""
-    global cache
+    """Clear the cache"""
+    with _memory_lock:
+        memory_cache.clear()
     cache.clear()
+    cache.stats(reset=True)
     return "Cache cleared successfully!"
 
 def get_cache_stats():
     """Get detailed cache statistics"""
-    _cleanup_expired()
-    total_items = len(cache)
-    expired_items = sum(1 for item in cache.values() if item.is_expired())
-    active_items = total_items - expired_items
-    
-    # Calculate memory usage estimate
-    memory_estimate = sum(len(str(item.data)) for item in cache.values())
-    
-    return f"Cache: {active_items} active items, {expired_items} expired, ~{memory_estimate} chars"
+    hits, misses = cache.stats()
+    return (f"Cache: {len(cache)} items, {len(memory_cache)} in memory, ~{cache.volume() // 1024} KB on disk, "
+            f"{hits} disk hits / {misses} disk misses")
 
 def get_cache_info():
     """Get detailed cache information for debugging"""
-    _cleanup_expired()
+    hits, misses = cache.stats()
     info = {
         "total_items": len(cache),
-        "max_size": CACHE_MAX_SIZE,
+        "memory_items": len(memory_cache),
+        "memory_bytes": memory_cache.currsize,
+        "memory_max_bytes": MEMORY_CACHE_MAX_BYTES,
+        "directory": cache.directory,
+        "size_limit": CACHE_SIZE_LIMIT,
         "ttl": CACHE_TTL,
-        "memory_usage": sum(len(str(item.data)) for item in cache.values()),
-        "oldest_item": min((item.timestamp for item in cache.values()), default=0),
-        "newest_item": max((item.timestamp for item in cache.values()), default=0)
+        "hits": hits,
+        "misses": misses,
+        "disk_usage": cache.volume()
     }
     return json.dumps(info, indent=2)
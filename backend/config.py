@@ -3,6 +3,7 @@ Configuration module for SUME Smart Summarizer
 Handles API configuration and environment variables
 """
 import os
+import threading
 import google.generativeai as genai
 from dotenv import load_dotenv
 
@@ -18,11 +19,31 @@ model = genai.GenerativeModel("gemini-2.5-flash")
 
 # Initialize Whisper model for speech recognition
 whisper_model = None
+_whisper_lock = threading.Lock()
+# Number of audio chunks the model can transcribe at the same time
+WHISPER_NUM_WORKERS = min(4, os.cpu_count() or 1)
+# CPU threads per worker, split so parallel workers do not oversubscribe the cores
+WHISPER_CPU_THREADS = max(1, (os.cpu_count() or 1) // WHISPER_NUM_WORKERS)
 
 def get_whisper_model():
     """Get or initialize Whisper model"""
     global whisper_model
-    if whisper_model is None:
-        import whisper
-        whisper_model = whisper.load_model("base")  # Using base model for speed
+    if whisper_model is not None:
+        return whisper_model
+    # The warm-up thread and the first requests can race here; only one of them loads the weights
+    with _whisper_lock:
+        if whisper_model is None:
+            whisper_model = _load_whisper_model()
     return whisper_model
+
+def _load_whisper_model():
+    """Build the faster-whisper model for the available hardware"""
+    import ctranslate2
+    from faster_whisper import WhisperModel
+    # CTranslate2 backend with INT8 weights; on a GPU, activations run in FP16 on the Tensor cores
+    if ctranslate2.get_cuda_device_count() > 0:
+        device, compute_type = "cuda", "int8_float16"
+    else:
+        device, compute_type = "cpu", "int8"
+    return WhisperModel("base", device=device, compute_type=compute_type,
+                        num_workers=WHISPER_NUM_WORKERS, cpu_threads=WHISPER_CPU_THREADS)  # Using base model for speed
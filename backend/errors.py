@@ -0,0 +1,17 @@
+"""
+Error types for SUME Smart Summarizer
+Backend steps raise SumeError; the public entry points turn it into a "⚠️ ..." message for the UI
+"""
+
+class SumeError(Exception):
+    """Processing failure whose message is meant for the user"""
+
+    @classmethod
+    def from_message(cls, message: str) -> "SumeError":
+        """Build from an existing "⚠️ ..." message (e.g. a validator result)"""
+        return cls(message.removeprefix("⚠️").strip())
+
+    @property
+    def message(self) -> str:
+        """The error in the "⚠️ ..." form shown in the UI"""
+        return f"⚠️ {self}"
@@ -1,55 +1,127 @@
+import io
+import mmap
 import os
 import re
-from PyPDF2 import PdfReader
-from docx import Document
-from bs4 import BeautifulSoup
-
-# --- Extract text by file type ---
-def extract_txt(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        return f.read()
-
-def extract_md(file_path):
-    text = extract_txt(file_path)
-    text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)  # remove code blocks
-    text = re.sub(r"#+\s*", "", text)  # remove headers
-    text = re.sub(r"(\*\*|__|\*|_)", "", text)  # remove bold/italic
+import threading
+from functools import lru_cache
+# PDF, Word and HTML parsers are imported by the extractors that use them, so importing
+# this module (and summarizing plain text) doesn't load them
+from .cache_manager import cache_by_file_content
+from .errors import SumeError
+
+# Text formats at least this large are memory-mapped instead of read into a bytes object
+MMAP_EXTENSIONS = frozenset({".txt", ".md"})
+MMAP_MIN_SIZE = 1024 * 1024
+
+# Serializes all calls into PDFium (see _extract_pdf_pdfium)
+_pdfium_lock = threading.Lock()
+
+# --- Extract text by file type (from in-memory bytes) ---
+def extract_txt(data):
+    # str() decodes any buffer, so memory-mapped files need no intermediate bytes copy
+    return str(data, "utf-8")
+
+_MD_CODE_RE = re.compile(r"```.*?```", re.DOTALL)
+_MD_HEADER_RE = re.compile(r"#+\s*")
+_MD_EMPHASIS_RE = re.compile(r"(\*\*|__|\*|_)")
+
+def extract_md(data):
+    text = extract_txt(data)
+    text = _MD_CODE_RE.sub("", text)  # remove code blocks
+    text = _MD_HEADER_RE.sub("", text)  # remove headers
+    text = _MD_EMPHASIS_RE.sub("", text)  # remove bold/italic
     return text.strip()
 
-def extract_pdf(file_path):
-    reader = PdfReader(file_path)
-    text = ""
-    for page in reader.pages:
-        text += page.extract_text() or ""
-    return text
+@lru_cache(maxsize=1)
+def _pdfium():
+    # PDFium (C++) extracts text several times faster than pure-Python PyPDF2
+    try:
+        import pypdfium2
+    except ImportError:
+        return None
+    return pypdfium2
+
+def extract_pdf(data):
+    pdfium = _pdfium()
+    if pdfium is not None:
+        return _extract_pdf_pdfium(pdfium, data)
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(data))
+    return "".join(page.extract_text() or "" for page in reader.pages)
+
+def _extract_pdf_pdfium(pdfium, data):
+    # PDFium is not thread-safe, even across documents: concurrent uploads take turns for the
+    # whole life of the document, and its pages are read one after another
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(data)
+        try:
+            parts = []
+            for page in pdf:
+                textpage = page.get_textpage()
+                parts.append(textpage.get_text_range())
+                textpage.close()
+                page.close()
+            return "\n".join(parts)
+        finally:
+            pdf.close()
 
-def extract_docx(file_path):
-    doc = Document(file_path)
+def extract_docx(data):
+    from docx import Document
+    doc = Document(io.BytesIO(data))
     return "\n".join([p.text for p in doc.paragraphs])
 
-def extract_html(file_path):
-    with open(file_path, "r", encoding="utf-8") as f:
-        soup = BeautifulSoup(f, "html.parser")
+@lru_cache(maxsize=1)
+def _selectolax():
+    # Lexbor-based C parser; much faster than BeautifulSoup's pure-Python html.parser
+    try:
+        from selectolax.lexbor import LexborHTMLParser
+    except ImportError:
+        return None
+    return LexborHTMLParser
+
+def extract_html(data):
+    html_parser = _selectolax()
+    if html_parser is not None:
+        tree = html_parser(extract_txt(data))
+        node = tree.body or tree.root
+        return node.text(separator=" ") if node is not None else ""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(extract_txt(data), "html.parser")
     return soup.get_text()
 
-# --- Wrapper ---
-def extract_text_from_file(file_path):
-    ext = os.path.splitext(file_path)[1].lower()
+# --- Wrappers ---
+def extract_text_from_bytes(data, ext):
+    ext = ext.lower()
     if ext == ".txt":
-        return extract_txt(file_path)
+        return extract_txt(data)
     elif ext == ".md":
-        return extract_md(file_path)
+        return extract_md(data)
     elif ext == ".pdf":
-        return extract_pdf(file_path)
+        return extract_pdf(data)
     elif ext == ".docx":
-        return extract_docx(file_path)
+        return extract_docx(data)
     elif ext in [".html", ".htm"]:
-        return extract_html(file_path)
+        return extract_html(data)
     else:
-        return f"⚠️ Unsupported file type: {ext}"
+        raise SumeError(f"Unsupported file type: {ext}")
+
+@cache_by_file_content()
+def extract_text_from_file(file_path):
+    # Read the file once and parse it from memory
+    ext = os.path.splitext(file_path)[1].lower()
+    with open(file_path, "rb") as f:
+        if ext in MMAP_EXTENSIONS and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+            # Large plain-text files are decoded straight from the mapped pages
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return extract_text_from_bytes(mapped, ext)
+        return extract_text_from_bytes(f.read(), ext)
 
 # --- Chunk text if too long ---
+@lru_cache(maxsize=8)
+def _chunk_re(max_words):
+    # Up to max_words whitespace-separated words, matched in one pass by the C regex engine
+    return re.compile(r"\S+(?:\s+\S+){0,%d}" % (max_words - 1))
+
 def chunk_text(text, max_words=1000):
-    words = text.split()
-    for i in range(0, len(words), max_words):
-        yield " ".join(words[i:i+max_words])
\ No newline at end of file
+    # Chunks are slices of the original text cut at word boundaries, so no per-word strings are kept
+    return _chunk_re(max_words).findall(text)
@@ -3,7 +3,7 @@ Centralized language list for translation features.
 Gemini typically supports a wide range of languages; users can also enter custom values.
 """
 
-languages_list = [
+languages_list = (
     "Afrikaans", "Albanian", "Amharic", "Arabic", "Armenian", "Azerbaijani", "Basque",
     "Belarusian", "Bengali", "Bosnian", "Bulgarian", "Catalan",
     "Chinese (Simplified)", "Chinese (Traditional)", "Croatian", "Czech", "Danish",
@@ -18,4 +18,7 @@ languages_list = [
     "Swedish", "Tajik", "Tamil", "Tatar", "Telugu", "Thai", "Turkish",
     "Turkmen", "Ukrainian", "Urdu", "Uzbek", "Vietnamese", "Welsh", "Xhosa",
     "Yoruba", "Zulu"
-]
\ No newline at end of file
+)
+
+# Set view of languages_list for O(1) membership checks
+languages_set = frozenset(languages_list)
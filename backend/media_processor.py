@@ -5,18 +5,54 @@ Handles audio/video processing and speech-to-text conversion with improved resou
 import tempfile
 import os
 import logging
+import math
 import shutil
 import atexit
-from contextlib import contextmanager
-from pydub import AudioSegment
-import yt_dlp
+import subprocess
+import threading
+import urllib.parse
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
 import requests
-from .config import get_whisper_model
-from .validation import validate_media_file, estimate_processing_time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .config import get_whisper_model, WHISPER_NUM_WORKERS
+from .cache_manager import cache_by_file_content, file_cache_key, get_cached_result, store_result
+from .errors import SumeError
+from .validation import (
+    probe_file, validate_media_file, estimate_processing_time,
+    MAX_MEDIA_FILE_SIZE, SUPPORTED_MEDIA_EXTENSIONS
+)
 
-# Global whisper model cache
-_whisper_model = None
 _temp_dirs = set()
+_whisper_warmed_up = False
+_whisper_warm_up_lock = threading.Lock()
+_NO_SPEECH_MESSAGE = "Could not recognize speech. The audio might be too quiet or unclear."
+_TOO_LARGE_MESSAGE = f"Media file is too large. Maximum {MAX_MEDIA_FILE_SIZE // (1024*1024)}MB allowed."
+# Shared session so repeated downloads reuse pooled (keep-alive) connections; transient
+# connection errors and gateway failures are retried with backoff
+_http = requests.Session()
+_http_adapter = HTTPAdapter(
+    pool_connections=10, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=(502, 503, 504))
+)
+_http.mount("https://", _http_adapter)
+_http.mount("http://", _http_adapter)
+# 1 MB reads keep the number of read/write syscalls per download low
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+# Parallel downloads for batches of media URLs, and parallel DASH fragments per yt-dlp download
+MEDIA_DOWNLOAD_WORKERS = 4
+# Whisper expects 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+# Window length for incremental transcription (speech_to_text_windows)
+TRANSCRIBE_WINDOW_SECONDS = 5 * 60
+# Audio is cut into ~30 s pieces (Whisper's own window) that are transcribed in parallel
+TRANSCRIBE_CHUNK_SECONDS = 30
+# Cuts are placed at the quietest 20 ms frame within the last 2 s of each piece
+SPLIT_SEARCH_SECONDS = 2
+SPLIT_FRAME_SAMPLES = WHISPER_SAMPLE_RATE // 50
 
 def _cleanup_temp_dirs():
     """Clean up all temporary directories on exit"""
@@ -28,167 +64,363 @@ def _cleanup_temp_dirs():
 # Register cleanup function
 atexit.register(_cleanup_temp_dirs)
 
-@contextmanager
-def temp_audio_file(suffix=".wav"):
-    """Context manager for temporary audio files with automatic cleanup"""
-    temp_file = None
+def _make_temp_dir() -> str:
+    """Create a temporary directory that is removed at exit if the caller does not remove it first"""
+    temp_dir = tempfile.mkdtemp(prefix="sume_")
+    _temp_dirs.add(temp_dir)
+    return temp_dir
+
+def _remove_temp_dir(temp_dir: str) -> None:
+    """Remove a directory created by _make_temp_dir"""
+    shutil.rmtree(temp_dir, ignore_errors=True)
+    _temp_dirs.discard(temp_dir)
+
+# Small WAV files are decoded in-process with libsndfile instead of spawning ffmpeg. soundfile
+# decodes the whole file at its native rate and channel count before downmixing/resampling,
+# so larger files (and compressed formats, which expand several times) go through ffmpeg
+SOUNDFILE_EXTENSIONS = frozenset({".wav"})
+SOUNDFILE_MAX_SIZE = 32 * 1024 * 1024
+
+# ffmpeg output options: drop any video stream and write raw 16-bit little-endian mono PCM
+# at Whisper's rate to stdout
+_FFMPEG_PCM_OUTPUT = ["-vn", "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1",
+                      "-ar", str(WHISPER_SAMPLE_RATE), "-"]
+
+@lru_cache(maxsize=1)
+def _ffmpeg_available() -> bool:
+    """Whether the ffmpeg binary is on PATH"""
+    return shutil.which("ffmpeg") is not None
+
+def _pcm_to_float(pcm: bytes) -> np.ndarray:
+    """Convert s16le PCM bytes to the float32 samples Whisper expects"""
+    return np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+
+def _load_with_soundfile(input_file: str) -> Optional[np.ndarray]:
+    """Decode audio in-process with libsndfile and resample to 16 kHz mono; None if it cannot be read"""
+    import soundfile as sf
+    from scipy.signal import resample_poly
     try:
-        temp_file = tempfile.mktemp(suffix=suffix)
-        yield temp_file
-    finally:
-        if temp_file and os.path.exists(temp_file):
-            os.remove(temp_file)
+        data, sample_rate = sf.read(input_file, dtype="float32", always_2d=True)
+    except Exception as e:
+        logging.info(f"soundfile could not read {input_file}, falling back to ffmpeg: {e}")
+        return None
+    
+    audio = data.mean(axis=1)
+    if sample_rate != WHISPER_SAMPLE_RATE:
+        factor = math.gcd(sample_rate, WHISPER_SAMPLE_RATE)
+        audio = resample_poly(audio, WHISPER_SAMPLE_RATE // factor, sample_rate // factor)
+    return audio.astype(np.float32, copy=False)
 
-def prepare_audio_for_whisper(input_file: str) -> str:
-    """Convert audio to format suitable for Whisper processing with better error handling"""
+def _decode_audio_file(input_file: str, ext: str) -> np.ndarray:
+    """Decode an already validated media file to 16 kHz mono float32 samples, piped straight into memory"""
+    if ext in SOUNDFILE_EXTENSIONS and os.path.getsize(input_file) <= SOUNDFILE_MAX_SIZE:
+        audio = _load_with_soundfile(input_file)
+        if audio is not None:
+            return audio
+    
+    if not _ffmpeg_available():
+        raise SumeError("FFmpeg is not installed. Install it to transcribe this media format.")
+    
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", input_file] + _FFMPEG_PCM_OUTPUT
     try:
-        # Validate input file first
-        is_valid, error_msg, ext = validate_media_file(input_file)
-        if not is_valid:
-            raise ValueError(error_msg)
-        
-        with temp_audio_file(".wav") as output_file:
-            # Load audio with error handling
-            try:
-                audio = AudioSegment.from_file(input_file)
-            except Exception as e:
-                raise ValueError(f"Failed to load audio file: {e}")
-            
-            # Convert to mono and standardize sample rate
-            try:
-                audio = audio.set_frame_rate(16000).set_channels(1)
-            except Exception as e:
-                raise ValueError(f"Failed to process audio: {e}")
-            
-            # Export as WAV with error handling
+        result = subprocess.run(cmd, capture_output=True, check=True)
+    except subprocess.CalledProcessError as e:
+        logging.error(f"Audio preparation error: {e.stderr.decode(errors='ignore').strip()}")
+        raise SumeError("Failed to decode audio from the media file.")
+    
+    return _pcm_to_float(result.stdout)
+
+def _decode_audio_stream(chunks, max_bytes: int = MAX_MEDIA_FILE_SIZE) -> Optional[np.ndarray]:
+    """Pipe encoded media chunks through ffmpeg's stdin; None if ffmpeg cannot decode the stream"""
+    proc = subprocess.Popen(
+        ["ffmpeg", "-loglevel", "error", "-i", "pipe:0"] + _FFMPEG_PCM_OUTPUT,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    feed_errors = []
+    
+    def feed():
+        # Written from a separate thread so ffmpeg's stdout never fills up and blocks it
+        received = 0
+        try:
+            for chunk in chunks:
+                received += len(chunk)
+                if received > max_bytes:
+                    # Same limit as uploaded media; stop decoding instead of buffering the rest
+                    feed_errors.append(SumeError(_TOO_LARGE_MESSAGE))
+                    proc.kill()
+                    return
+                proc.stdin.write(chunk)
+        except BrokenPipeError:
+            pass
+        except Exception as e:
+            feed_errors.append(e)
+        finally:
             try:
-                audio.export(output_file, format="wav")
-            except Exception as e:
-                raise ValueError(f"Failed to export audio: {e}")
-            
-            # Return a copy since the temp file will be cleaned up
-            final_file = tempfile.mktemp(suffix=".wav")
-            shutil.copy2(output_file, final_file)
-            return final_file
-            
-    except Exception as e:
-        logging.error(f"Audio preparation error: {e}")
-        raise
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+    
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+    pcm = proc.stdout.read()
+    feeder.join()
+    returncode = proc.wait()
+    if feed_errors:
+        raise feed_errors[0]
+    return _pcm_to_float(pcm) if returncode == 0 else None
+
+def _transcribe(audio: np.ndarray) -> str:
+    """Run faster-whisper on decoded audio and join its segments"""
+    # Pieces are decoded independently (no conditioning on the previous window, which also
+    # stops hallucinations from cascading), and the built-in Silero VAD skips silent stretches
+    segments, _ = get_whisper_model().transcribe(
+        audio, beam_size=5, condition_on_previous_text=False,
+        vad_filter=True, no_speech_threshold=0.6, compression_ratio_threshold=2.4
+    )
+    # Segments are generated lazily and carry their own leading spaces
+    return "".join(segment.text for segment in segments).strip()
+
+def _split_audio(audio: np.ndarray) -> list:
+    """Split audio into ~TRANSCRIBE_CHUNK_SECONDS pieces, cutting at low-energy points to avoid splitting words"""
+    chunk_samples = TRANSCRIBE_CHUNK_SECONDS * WHISPER_SAMPLE_RATE
+    search_samples = SPLIT_SEARCH_SECONDS * WHISPER_SAMPLE_RATE
+    pieces = []
+    start = 0
+    while len(audio) - start > chunk_samples:
+        search_start = start + chunk_samples - search_samples
+        frames = audio[search_start:start + chunk_samples].reshape(-1, SPLIT_FRAME_SAMPLES)
+        quietest = int(np.argmin(np.square(frames).sum(axis=1)))
+        cut = search_start + quietest * SPLIT_FRAME_SAMPLES + SPLIT_FRAME_SAMPLES // 2
+        pieces.append(audio[start:cut])
+        start = cut
+    pieces.append(audio[start:])
+    return pieces
+
+def _transcribe_parallel(audio: np.ndarray) -> str:
+    """Transcribe audio as independent pieces on WHISPER_NUM_WORKERS model workers"""
+    # Waits for a startup warm-up still in progress, so the two never share the model
+    warm_up_whisper()
+    pieces = _split_audio(audio)
+    if len(pieces) == 1:
+        return _transcribe(audio)
+    with ThreadPoolExecutor(max_workers=WHISPER_NUM_WORKERS) as executor:
+        texts = executor.map(_transcribe, pieces)
+        return " ".join(text for text in texts if text)
 
+def warm_up_whisper() -> None:
+    """Load the Whisper model and run one dummy transcription so the first real request is not slowed down"""
+    global _whisper_warmed_up
+    if _whisper_warmed_up:
+        return
+    with _whisper_warm_up_lock:
+        if _whisper_warmed_up:
+            return
+        try:
+            # One second of silence is enough to initialize the model's compute kernels;
+            # VAD is off here because it would drop the silence before the model runs
+            segments, _ = get_whisper_model().transcribe(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), vad_filter=False)
+            list(segments)
+        except Exception as e:
+            logging.warning(f"Whisper warm-up failed: {e}")
+        _whisper_warmed_up = True
+
+@cache_by_file_content()
 def speech_to_text(file_path: str) -> str:
-    """Convert speech to text using OpenAI Whisper with improved resource management"""
-    wav_file = None
+    """Convert speech to text using faster-whisper; raises SumeError on failure"""
+    # Validate input first; one stat() serves validation and the estimate
+    meta = probe_file(file_path)
+    is_valid, error_msg, ext = validate_media_file(meta)
+    if not is_valid:
+        raise SumeError.from_message(error_msg)
+    
+    # Get processing time estimate
+    time_estimate = estimate_processing_time(meta)
+    logging.info(f"Processing media file, estimated time: {time_estimate}")
+    
+    # Decode audio for Whisper
+    audio = _decode_audio_file(file_path, ext)
+    
+    # Transcribe audio with progress tracking
+    logging.info("Starting transcription...")
     try:
-        # Validate input first
-        is_valid, error_msg, ext = validate_media_file(file_path)
-        if not is_valid:
-            return error_msg
-        
-        # Get processing time estimate
-        time_estimate = estimate_processing_time(file_path)
-        logging.info(f"Processing media file, estimated time: {time_estimate}")
-        
-        # Prepare audio for Whisper
-        wav_file = prepare_audio_for_whisper(file_path)
-        
-        # Use cached model or load new one
-        global _whisper_model
-        if _whisper_model is None:
-            _whisper_model = get_whisper_model()
-        
-        # Transcribe audio with progress tracking
-        logging.info("Starting transcription...")
-        result = _whisper_model.transcribe(wav_file)
-        
-        # Return transcript
-        transcript = result["text"].strip()
-        if not transcript:
-            return "⚠️ Could not recognize speech. The audio might be too quiet or unclear."
-        
-        logging.info(f"Transcription completed. Length: {len(transcript)} characters")
-        return transcript
-        
-    except ValueError as e:
-        # Input validation errors
-        return str(e)
+        transcript = _transcribe_parallel(audio)
     except Exception as e:
         logging.error(f"Whisper speech-to-text error: {e}")
-        return f"⚠️ Speech-to-text failed: {e}"
-    finally:
-        # Clean up temp file
-        if wav_file and os.path.exists(wav_file):
-            try:
-                os.remove(wav_file)
-            except OSError:
-                logging.warning(f"Could not remove temp file: {wav_file}")
+        raise SumeError(f"Speech-to-text failed: {e}") from e
+    if not transcript:
+        raise SumeError(_NO_SPEECH_MESSAGE)
+    
+    logging.info(f"Transcription completed. Length: {len(transcript)} characters")
+    return transcript
+
+def speech_to_text_windows(file_path: str, stop: Optional[threading.Event] = None):
+    """Transcribe media window by window, yielding each window's text as soon as it is ready; raises SumeError on failure"""
+    is_valid, error_msg, ext = validate_media_file(file_path)
+    if not is_valid:
+        raise SumeError.from_message(error_msg)
+    
+    # Share cache entries with speech_to_text
+    file_key = file_cache_key(file_path)
+    cached = get_cached_result("speech_to_text", file_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    windows = []
+    window_samples = TRANSCRIBE_WINDOW_SECONDS * WHISPER_SAMPLE_RATE
+    audio = _decode_audio_file(file_path, ext)
+    for start in range(0, len(audio), window_samples):
+        if stop is not None and stop.is_set():
+            # The caller gave up (error or cancelled request); don't keep Whisper busy or cache a partial transcript
+            return
+        try:
+            text = _transcribe_parallel(audio[start:start + window_samples])
+        except Exception as e:
+            logging.error(f"Whisper speech-to-text error: {e}")
+            raise SumeError(f"Speech-to-text failed: {e}") from e
+        if text:
+            windows.append(text)
+            yield text
+    
+    if not windows:
+        raise SumeError(_NO_SPEECH_MESSAGE)
+    store_result("speech_to_text", file_key, None, " ".join(windows))
+
+def _content_length(r: requests.Response) -> int:
+    """Declared body size of a media response (0 if unknown); raises SumeError above the media size limit"""
+    size = int(r.headers.get("content-length") or 0)
+    if size > MAX_MEDIA_FILE_SIZE:
+        raise SumeError(_TOO_LARGE_MESSAGE)
+    return size
+
+def _save_response(r: requests.Response, file_path: str) -> None:
+    """Write a streamed response to disk, reserving the full file up front when its size is known"""
+    # The declared size is checked before anything is reserved, and the body is counted as
+    # it arrives since Content-Length can be missing or wrong
+    size = _content_length(r)
+    with open(file_path, "wb") as f:
+        if size and hasattr(os, "posix_fallocate"):
+            # One contiguous allocation instead of growing the file write by write
+            os.posix_fallocate(f.fileno(), 0, size)
+        # Let urllib3 undo any Content-Encoding, then copy in 1 MB blocks
+        r.raw.decode_content = True
+        received = 0
+        for block in iter(lambda: r.raw.read(DOWNLOAD_CHUNK_SIZE), b""):
+            received += len(block)
+            if received > MAX_MEDIA_FILE_SIZE:
+                raise SumeError(_TOO_LARGE_MESSAGE)
+            f.write(block)
+        # Drop unused preallocated space (e.g. a compressed Content-Length)
+        f.truncate()
 
 def download_audio_from_media_url(url: str) -> str:
-    """Download audio from media URL (YouTube, direct links, etc.)"""
+    """Download audio from media URL (YouTube, direct links, etc.); raises SumeError on failure"""
+    temp_dir = _make_temp_dir()
     try:
-        temp_dir = tempfile.mkdtemp()
-        temp_file_path = os.path.join(temp_dir, "audio.mp3")
-
         # --- YouTube or other sites via yt-dlp ---
         if "youtube.com" in url or "youtu.be" in url:
             ydl_opts = {
                 "format": "bestaudio[ext=m4a]/bestaudio/best",
-                "outtmpl": os.path.join(temp_dir, "%(title)s.%(ext)s"),
+                "outtmpl": os.path.join(temp_dir, "audio.%(ext)s"),
                 "quiet": True,
                 "no_warnings": True,
                 "extract_flat": False,
                 "socket_timeout": 30,
                 "retries": 3,
-                "postprocessors": [{
-                    "key": "FFmpegExtractAudio",
-                    "preferredcodec": "mp3",
-                    "preferredquality": "192",
-                }],
+                "concurrent_fragment_downloads": MEDIA_DOWNLOAD_WORKERS,
+                # No audio postprocessor: the m4a/webm stream is decoded to 16 kHz PCM for
+                # Whisper directly, so re-encoding it to mp3 first would only cost time
             }
+            import yt_dlp  # only needed for site downloads; loading it is slow
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([url])
+                info = ydl.extract_info(url, download=True)
+                # yt-dlp reports the final path; older versions don't, so derive it
+                # from the output template instead
+                downloads = info.get("requested_downloads") or [{}]
+                file_path = downloads[0].get("filepath") or ydl.prepare_filename(info)
             
-            # Find the downloaded file (yt-dlp might rename it)
-            downloaded_files = [f for f in os.listdir(temp_dir) if f.endswith(('.mp3', '.m4a', '.webm'))]
-            if downloaded_files:
-                actual_file_path = os.path.join(temp_dir, downloaded_files[0])
-                return actual_file_path
-            else:
-                return f"⚠️ No audio file found after download"
+            if not os.path.exists(file_path):
+                raise SumeError("No audio file found after download")
+            return file_path
 
         # --- Direct media download ---
         else:
             ext = os.path.splitext(url)[-1].split("?")[0] or ".mp3"
             temp_file_path = os.path.join(temp_dir, f"audio{ext}")
 
-            r = requests.get(url, stream=True, timeout=30)
-            if r.status_code != 200:
-                return f"⚠️ Could not download media file, HTTP {r.status_code}"
-
-            with open(temp_file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
+            with _http.get(url, stream=True, timeout=30) as r:
+                if r.status_code != 200:
+                    raise SumeError(f"Could not download media file, HTTP {r.status_code}")
+                _save_response(r, temp_file_path)
             return temp_file_path
 
+    except SumeError:
+        _remove_temp_dir(temp_dir)
+        raise
     except Exception as e:
-        return f"⚠️ Audio download error: {e}"
+        _remove_temp_dir(temp_dir)
+        raise SumeError(f"Audio download error: {e}") from e
 
-def transcribe_media_url(url: str) -> str:
-    """Download and transcribe media from URL"""
-    file_path = download_audio_from_media_url(url)
-    if file_path.startswith("⚠️"):
-        return file_path
+def download_audio_from_media_urls(urls: List[str]) -> List[str]:
+    """Download several media URLs concurrently; raises SumeError if any download fails"""
+    with ThreadPoolExecutor(max_workers=MEDIA_DOWNLOAD_WORKERS) as executor:
+        futures = [executor.submit(download_audio_from_media_url, url) for url in urls]
     
-    # Check if file actually exists
-    if not os.path.exists(file_path):
-        return f"⚠️ Downloaded file not found: {file_path}"
+    file_paths, errors = [], []
+    for future in futures:
+        try:
+            file_paths.append(future.result())
+        except SumeError as e:
+            errors.append(e)
+    if errors:
+        # Don't leave the successful downloads behind when the batch fails
+        for file_path in file_paths:
+            _remove_temp_dir(os.path.dirname(file_path))
+        raise errors[0]
+    return file_paths
+
+def _transcribe_direct_url(url: str) -> Optional[str]:
+    """Stream a direct media link through ffmpeg and transcribe it without writing a file"""
+    if not _ffmpeg_available():
+        # The file download path can still decode formats soundfile handles
+        return None
+    # Same extension check an uploaded or downloaded file gets (links without one are tried as-is)
+    ext = os.path.splitext(urllib.parse.urlparse(url).path)[1].lower()
+    if ext and ext not in SUPPORTED_MEDIA_EXTENSIONS:
+        raise SumeError(f"Unsupported media type: {ext}. Supported: {', '.join(SUPPORTED_MEDIA_EXTENSIONS)}")
+    try:
+        with _http.get(url, stream=True, timeout=30) as r:
+            if r.status_code != 200:
+                raise SumeError(f"Could not download media file, HTTP {r.status_code}")
+            _content_length(r)
+            audio = _decode_audio_stream(r.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE))
+    except SumeError:
+        raise
+    except Exception as e:
+        raise SumeError(f"Audio download error: {e}") from e
+    if audio is None:
+        # Some containers (e.g. MP4 with the index at the end) need a seekable file
+        return None
     
     try:
-        transcript = speech_to_text(file_path)
-        return transcript
+        transcript = _transcribe_parallel(audio)
     except Exception as e:
-        return f"⚠️ Speech-to-text failed: {e}"
+        logging.error(f"Whisper speech-to-text error: {e}")
+        raise SumeError(f"Speech-to-text failed: {e}") from e
+    if not transcript:
+        raise SumeError(_NO_SPEECH_MESSAGE)
+    return transcript
+
+def transcribe_media_url(url: str) -> str:
+    """Download and transcribe media from URL; raises SumeError on failure"""
+    if not ("youtube.com" in url or "youtu.be" in url):
+        transcript = _transcribe_direct_url(url)
+        if transcript is not None:
+            return transcript
+    
+    file_path = download_audio_from_media_url(url)
+    try:
+        return speech_to_text(file_path)
     finally:
         # Clean up the entire temp directory
-        temp_dir = os.path.dirname(file_path)
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir, ignore_errors=True)
+        _remove_temp_dir(os.path.dirname(file_path))
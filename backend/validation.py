@@ -4,17 +4,48 @@ Handles validation of inputs to prevent unnecessary processing
 """
 import os
 import re
-import urllib.parse
-from typing import Tuple, Optional, List
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple, Optional, List, Union
+from .languages import languages_set
 
 # File size limits (in bytes)
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_MEDIA_FILE_SIZE = MAX_FILE_SIZE * 2  # Media files can be larger
 MAX_TEXT_LENGTH = 1000000  # 1M characters
 MAX_URL_LENGTH = 2048
 
 # Supported file extensions
-SUPPORTED_TEXT_EXTENSIONS = {'.txt', '.md', '.docx', '.pdf'}
-SUPPORTED_MEDIA_EXTENSIONS = {'.mp3', '.mp4', '.wav', '.m4a', '.webm', '.avi', '.mov'}
+SUPPORTED_TEXT_EXTENSIONS = frozenset({'.txt', '.md', '.docx', '.pdf'})
+SUPPORTED_MEDIA_EXTENSIONS = frozenset({'.mp3', '.mp4', '.wav', '.m4a', '.webm', '.avi', '.mov'})
+
+# Patterns used on every click, compiled once at import
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Simple character/prefix checks are done with plain string operations
+_INVALID_LANGUAGE_CHARS = frozenset('<>"\'')
+_URL_SCHEMES = ('http://', 'https://')
+_UNSAFE_URL_PATTERNS = ('javascript:', 'data:', 'file:')
+
+@dataclass(frozen=True)
+class FileMeta:
+    """Extension and size of a file from a single stat() call, shared by the validation helpers"""
+    path: str
+    ext: str
+    size: int
+    exists: bool
+    accessible: bool
+
+def probe_file(file_path: str) -> FileMeta:
+    """Stat a file once; pass the result to validate_*/estimate_processing_time instead of the path"""
+    _, ext = os.path.splitext(file_path.lower())
+    try:
+        size = os.stat(file_path).st_size
+    except FileNotFoundError:
+        return FileMeta(file_path, ext, 0, exists=False, accessible=False)
+    except OSError:
+        return FileMeta(file_path, ext, 0, exists=True, accessible=False)
+    return FileMeta(file_path, ext, size, exists=True, accessible=True)
 
 def validate_text_input(text: str) -> Tuple[bool, str]:
     """Validate text input for summarization"""
@@ -28,70 +59,60 @@ def validate_text_input(text: str) -> Tuple[bool, str]:
         return False, f"⚠️ Text is too long. Maximum {MAX_TEXT_LENGTH:,} characters allowed."
     
     # Check for meaningful content (not just whitespace or repeated characters)
-    cleaned_text = re.sub(r'\s+', ' ', text.strip())
+    cleaned_text = _WHITESPACE_RE.sub(' ', text.strip())
     if len(cleaned_text) < 10:
         return False, "⚠️ Text must contain meaningful content."
     
     # Check for excessive repetition
     words = cleaned_text.split()
     if len(words) > 10:
-        unique_words = len(set(word.lower() for word in words))
-        if unique_words / len(words) < 0.3:  # Less than 30% unique words
+        # Less than 30% unique words is rejected; stop as soon as enough unique words are seen
+        required_unique = (3 * len(words) + 9) // 10
+        seen = set()
+        for word in words:
+            seen.add(word.lower())
+            if len(seen) >= required_unique:
+                break
+        else:
             return False, "⚠️ Text appears to have excessive repetition."
     
     return True, "Valid text input."
 
-def validate_file_input(file_path: str) -> Tuple[bool, str, Optional[str]]:
-    """Validate file input for processing"""
+def _validate_path(file: Union[str, FileMeta], supported_extensions: frozenset, max_size: int,
+                   label: str, type_label: str) -> Tuple[bool, str, Optional[str]]:
+    """Shared checks for validate_file_input/validate_media_file with at most one stat() call"""
+    meta = file if isinstance(file, FileMeta) else None
+    file_path = meta.path if meta else file
     if not file_path or not isinstance(file_path, str):
-        return False, "⚠️ File path is required.", None
+        return False, f"⚠️ {label} path is required.", None
     
-    if not os.path.exists(file_path):
-        return False, "⚠️ File does not exist.", None
+    # Check file extension first; it needs no disk access
+    ext = meta.ext if meta else os.path.splitext(file_path.lower())[1]
+    if ext not in supported_extensions:
+        return False, f"⚠️ Unsupported {type_label}: {ext}. Supported: {', '.join(supported_extensions)}", None
     
-    # Check file size
-    try:
-        file_size = os.path.getsize(file_path)
-        if file_size > MAX_FILE_SIZE:
-            return False, f"⚠️ File is too large. Maximum {MAX_FILE_SIZE // (1024*1024)}MB allowed.", None
-        
-        if file_size == 0:
-            return False, "⚠️ File is empty.", None
-    except OSError:
-        return False, "⚠️ Cannot access file.", None
+    if meta is None:
+        meta = probe_file(file_path)
+    if not meta.exists:
+        return False, f"⚠️ {label} does not exist.", None
+    if not meta.accessible:
+        return False, f"⚠️ Cannot access {label.lower()}.", None
     
-    # Check file extension
-    _, ext = os.path.splitext(file_path.lower())
-    if ext not in SUPPORTED_TEXT_EXTENSIONS:
-        return False, f"⚠️ Unsupported file type: {ext}. Supported: {', '.join(SUPPORTED_TEXT_EXTENSIONS)}", None
+    if meta.size > max_size:
+        return False, f"⚠️ {label} is too large. Maximum {max_size // (1024*1024)}MB allowed.", None
+    
+    if meta.size == 0:
+        return False, f"⚠️ {label} is empty.", None
     
-    return True, "Valid file input.", ext
+    return True, f"Valid {label.lower()} input.", ext
+
+def validate_file_input(file_path: Union[str, FileMeta]) -> Tuple[bool, str, Optional[str]]:
+    """Validate file input for processing"""
+    return _validate_path(file_path, SUPPORTED_TEXT_EXTENSIONS, MAX_FILE_SIZE, "File", "file type")
 
-def validate_media_file(file_path: str) -> Tuple[bool, str, Optional[str]]:
+def validate_media_file(file_path: Union[str, FileMeta]) -> Tuple[bool, str, Optional[str]]:
     """Validate media file input for processing"""
-    if not file_path or not isinstance(file_path, str):
-        return False, "⚠️ Media file path is required.", None
-    
-    if not os.path.exists(file_path):
-        return False, "⚠️ Media file does not exist.", None
-    
-    # Check file size
-    try:
-        file_size = os.path.getsize(file_path)
-        if file_size > MAX_FILE_SIZE * 2:  # Media files can be larger
-            return False, f"⚠️ Media file is too large. Maximum {MAX_FILE_SIZE * 2 // (1024*1024)}MB allowed.", None
-        
-        if file_size == 0:
-            return False, "⚠️ Media file is empty.", None
-    except OSError:
-        return False, "⚠️ Cannot access media file.", None
-    
-    # Check file extension
-    _, ext = os.path.splitext(file_path.lower())
-    if ext not in SUPPORTED_MEDIA_EXTENSIONS:
-        return False, f"⚠️ Unsupported media type: {ext}. Supported: {', '.join(SUPPORTED_MEDIA_EXTENSIONS)}", None
-    
-    return True, "Valid media file input.", ext
+    return _validate_path(file_path, SUPPORTED_MEDIA_EXTENSIONS, MAX_MEDIA_FILE_SIZE, "Media file", "media type")
 
 def validate_url(url: str) -> Tuple[bool, str]:
     """Validate URL input"""
@@ -101,29 +122,31 @@ def validate_url(url: str) -> Tuple[bool, str]:
     if len(url) > MAX_URL_LENGTH:
         return False, f"⚠️ URL is too long. Maximum {MAX_URL_LENGTH} characters allowed."
     
-    # Parse URL
-    try:
-        parsed = urllib.parse.urlparse(url)
-        if not parsed.scheme:
-            url = "http://" + url
-            parsed = urllib.parse.urlparse(url)
-        
-        if not parsed.netloc:
-            return False, "⚠️ Invalid URL format."
-        
-        # Check for suspicious patterns
-        if any(pattern in url.lower() for pattern in ['javascript:', 'data:', 'file:']):
-            return False, "⚠️ URL contains potentially unsafe content."
-        
-        return True, "Valid URL input."
-    except Exception:
+    lowered = url.strip().lower()
+    if any(pattern in lowered for pattern in _UNSAFE_URL_PATTERNS):
+        return False, "⚠️ URL contains potentially unsafe content."
+    
+    # Bare hosts like "example.com/page" are treated as http
+    if not lowered.startswith(_URL_SCHEMES):
+        if '://' in lowered:
+            return False, "⚠️ Only http and https URLs are supported."
+        lowered = 'http://' + lowered
+    
+    host = lowered.split('://', 1)[1].split('/', 1)[0].split('?', 1)[0].split('#', 1)[0]
+    if not host or any(char.isspace() for char in lowered):
         return False, "⚠️ Invalid URL format."
+    
+    return True, "Valid URL input."
 
 def validate_language(language: str) -> Tuple[bool, str]:
     """Validate language input for translation"""
     if not language or not isinstance(language, str):
         return False, "⚠️ Language is required and must be a string."
     
+    # Dropdown choices are valid by construction; only custom values need checking
+    if language in languages_set:
+        return True, "Valid language input."
+    
     # Basic validation - check for reasonable length and characters
     if len(language.strip()) < 2:
         return False, "⚠️ Language name must be at least 2 characters long."
@@ -132,7 +155,7 @@ def validate_language(language: str) -> Tuple[bool, str]:
         return False, "⚠️ Language name is too long."
     
     # Check for suspicious patterns
-    if re.search(r'[<>"\']', language):
+    if not _INVALID_LANGUAGE_CHARS.isdisjoint(language):
         return False, "⚠️ Language name contains invalid characters."
     
     return True, "Valid language input."
@@ -156,36 +179,31 @@ def validate_custom_prompt(prompt: str) -> Tuple[bool, str]:
 
 def get_file_type_info(file_path: str) -> dict:
     """Get detailed information about a file"""
-    try:
-        stat = os.stat(file_path)
-        _, ext = os.path.splitext(file_path.lower())
-        
-        return {
-            "size": stat.st_size,
-            "extension": ext,
-            "is_text": ext in SUPPORTED_TEXT_EXTENSIONS,
-            "is_media": ext in SUPPORTED_MEDIA_EXTENSIONS,
-            "size_mb": round(stat.st_size / (1024 * 1024), 2)
-        }
-    except OSError:
+    meta = probe_file(file_path)
+    if not meta.accessible:
         return {"error": "Cannot access file"}
-
-def estimate_processing_time(file_path: str) -> str:
-    """Estimate processing time based on file characteristics"""
-    info = get_file_type_info(file_path)
-    if "error" in info:
-        return "Unknown"
     
-    size_mb = info["size_mb"]
+    return {
+        "size": meta.size,
+        "extension": meta.ext,
+        "is_text": meta.ext in SUPPORTED_TEXT_EXTENSIONS,
+        "is_media": meta.ext in SUPPORTED_MEDIA_EXTENSIONS,
+        "size_mb": round(meta.size / (1024 * 1024), 2)
+    }
+
+@lru_cache(maxsize=64)
+def _estimate_for(ext: str, size: int) -> str:
+    """Processing time estimate for a file type and size (memoized)"""
+    size_mb = round(size / (1024 * 1024), 2)
     
-    if info["is_text"]:
+    if ext in SUPPORTED_TEXT_EXTENSIONS:
         if size_mb < 1:
             return "~5-10 seconds"
         elif size_mb < 5:
             return "~10-30 seconds"
         else:
             return "~30-60 seconds"
-    elif info["is_media"]:
+    elif ext in SUPPORTED_MEDIA_EXTENSIONS:
         if size_mb < 10:
             return "~30-60 seconds"
         elif size_mb < 50:
@@ -194,3 +212,10 @@ def estimate_processing_time(file_path: str) -> str:
             return "~3-5 minutes"
     
     return "Unknown"
+
+def estimate_processing_time(file_path: Union[str, FileMeta]) -> str:
+    """Estimate processing time based on file characteristics"""
+    meta = file_path if isinstance(file_path, FileMeta) else probe_file(file_path)
+    if not meta.accessible:
+        return "Unknown"
+    return _estimate_for(meta.ext, meta.size)
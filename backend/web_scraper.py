@@ -3,30 +3,48 @@ Web Scraping module for SUME Smart Summarizer
 Handles URL processing and web content extraction
 """
 import urllib.parse
-import trafilatura
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 from .cache_manager import cache_result
-from .media_processor import transcribe_media_url
+from .errors import SumeError
+
+# Pages fetched at the same time by get_texts_from_urls
+SCRAPE_MAX_WORKERS = 8
 
 @cache_result()
 def extract_article_main_text(url: str) -> str:
-    """Extract main text content from a webpage URL"""
+    """Extract main text content from a webpage URL; raises SumeError on failure"""
+    import trafilatura  # pulls in lxml and friends; only load it when a page is fetched
     try:
         if not urllib.parse.urlparse(url).scheme:
             url = "http://" + url
         downloaded = trafilatura.fetch_url(url)
-        if not downloaded:
-            return "⚠️ Could not download content from URL."
-        text = trafilatura.extract(downloaded)
-        return text if text else "⚠️ No main text found in the webpage."
+        text = trafilatura.extract(downloaded) if downloaded else None
     except Exception as e:
-        return f"⚠️ Error extracting text: {e}"
+        raise SumeError(f"Error extracting text: {e}") from e
+    if not downloaded:
+        raise SumeError("Could not download content from URL.")
+    if not text:
+        raise SumeError("No main text found in the webpage.")
+    return text
 
 @cache_result()
 def get_text_from_url(url: str, source_type: str) -> str:
     """Get text content from URL based on source type"""
-    if source_type == "Webpage":
-        return extract_article_main_text(url)
-    elif source_type == "Media":
-        return transcribe_media_url(url)
-    else:
-        return "⚠️ Invalid source type."
+    try:
+        if source_type == "Webpage":
+            return extract_article_main_text(url)
+        elif source_type == "Media":
+            # Imported here so webpage summaries never load yt-dlp, NumPy or Whisper
+            from .media_processor import transcribe_media_url
+            return transcribe_media_url(url)
+        else:
+            return "⚠️ Invalid source type."
+    except SumeError as e:
+        return e.message
+
+def get_texts_from_urls(urls: List[str], source_type: str) -> List[str]:
+    """Get text content from several URLs concurrently, in input order (failures come back as ⚠️ messages)"""
+    # Fetching is network-bound, so wall-clock time is close to the slowest URL rather than the sum
+    with ThreadPoolExecutor(max_workers=SCRAPE_MAX_WORKERS) as executor:
+        return list(executor.map(get_text_from_url, urls, [source_type] * len(urls)))